@@ -1,24 +1,34 @@
 import json
-from typing import List, Optional, Tuple
+from typing import Dict, List, Optional, Tuple
 
 import streamlit as st
 
+from classes.game_engine import (MAX_YEAR, MIN_YEAR, SESSION_TTL_SECONDS,
+                                 GameEngine, GameError)
+from classes.game_session import GameSession, RoundResult
 from classes.photo import Photo
-from modules import map_handler, ranking_handler, scores_handler
+from classes.place import Place
+from classes.session_store import SessionStore, create_session_store
+from modules import (geo_handler, heatmap_handler, map_handler,
+                     metrics_handler, photo_handler, profiler_handler,
+                     ranking_handler, rerun_handler, scores_handler,
+                     search_handler, startup_handler)
+
+startup_handler.mark('modules_imported')
 
 # Constantes
 PHOTOS_FILE = 'data/photos.json'
-MIN_YEAR = 1800
-MAX_YEAR = 2025
 DEFAULT_YEAR = 2020
+STATIC_RESULT_MAP = True  # False volta a sempre usar o mapa interativo
 
 
+@metrics_handler.timed('app.load_photos')
 def load_photos() -> List[Photo]:
-    """Carrega as fotos do arquivo JSON"""
+    """Carrega as fotos do arquivo JSON (catálogo compartilhado no processo)"""
     try:
-        with open(PHOTOS_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            return [Photo.from_dict(p) for p in data]
+        photos = list(photo_handler.load_photo_catalog(PHOTOS_FILE))
+        startup_handler.mark('photos_loaded')
+        return photos
     except FileNotFoundError:
         st.error(f"Arquivo {PHOTOS_FILE} não encontrado.")
         return []
@@ -30,16 +40,33 @@ def load_photos() -> List[Photo]:
         return []
 
 
+@st.cache_resource
+def get_session_store() -> SessionStore:
+    """Partidas do processo, mantidas quando o motor é recriado"""
+    return create_session_store(SESSION_TTL_SECONDS)
+
+
+@st.cache_resource(max_entries=1)
+def _create_game_engine(catalog_version: Tuple[int, int]) -> GameEngine:
+    """Motor do jogo para uma versão do catálogo de fotos"""
+    return GameEngine(photo_handler.load_photo_catalog(PHOTOS_FILE),
+                      store=get_session_store())
+
+
+def get_game_engine() -> GameEngine:
+    """
+    Motor do jogo, compartilhado por todas as sessões do processo. É
+    recriado (com o mesmo store de partidas) quando data/photos.json muda.
+    """
+    return _create_game_engine(photo_handler.catalog_version(PHOTOS_FILE))
+
+
 def initialize_session_state() -> None:
     """Inicializa todas as variáveis de sessão necessárias"""
     defaults = {
-        'current_photo_index': 0,  # não é o id da foto
-        'total_score': 0,
-        'guess_made': False,
-        'guess_coords': None,
-        'guess_year': None,
-        'game_finished': False,
-        'photos': None,
+        'game_id': None,  # o estado da partida fica no GameEngine
+        'guess_coords': None,  # chute no mapa ainda não enviado
+        'last_map_click': None,  # último clique já aplicado ao chute
         'map_zoom': None,
         'map_center': None,
     }
@@ -49,19 +76,38 @@ def initialize_session_state() -> None:
             # Seta os atributos de session_state
             st.session_state[key] = value
 
-    # Carrega fotos se ainda não foram carregadas
-    if st.session_state.photos is None:
-        st.session_state.photos = load_photos()
+
+def get_current_game() -> GameSession:
+    """
+    Retorna a partida da sessão, iniciando uma nova se não houver nenhuma
+    (ou se ela tiver expirado). Uma sessão nova retoma a partida do
+    parâmetro ?game= da URL, em qualquer instância que use o mesmo store.
+
+    Returns:
+        GameSession: Partida atual
+    """
+    engine = get_game_engine()
+
+    session = None
+    game_id = st.session_state.game_id or st.query_params.get('game')
+    if game_id:
+        session = engine.get_session(game_id)
+
+    if session is None:
+        reset_game()
+        session = engine.get_session(st.session_state.game_id)
+    else:
+        st.session_state.game_id = session.game_id
+
+    return session
 
 
 def reset_game() -> None:
-    """Reinicia o jogo resetando todas as variáveis relevantes"""
-    st.session_state.current_photo_index = 0
-    st.session_state.total_score = 0
-    st.session_state.guess_made = False
+    """Reinicia o jogo com uma nova partida e limpa as variáveis de chute"""
+    st.session_state.game_id = get_game_engine().start_game().game_id
+    st.query_params['game'] = st.session_state.game_id
     st.session_state.guess_coords = None
-    st.session_state.guess_year = None
-    st.session_state.game_finished = False
+    st.session_state.last_map_click = None
     st.session_state.map_zoom = None
     st.session_state.map_center = None
 
@@ -99,11 +145,11 @@ def display_photo_info(photo: Photo, show_answer: bool = False) -> None:
     st.caption(f"© {photo.photographer}")
 
 
-def display_round_header() -> None:
+def display_round_header(session: GameSession) -> None:
     """Exibe cabeçalho com informações da rodada atual"""
-    current_round = st.session_state.current_photo_index + 1
-    total_rounds = len(st.session_state.photos)
-    current_score = st.session_state.total_score
+    current_round = session.round_index + 1
+    total_rounds = session.total_rounds
+    current_score = session.total_score
 
     st.markdown(
         f"**Rodada:** {current_round}/{total_rounds} | "
@@ -111,12 +157,18 @@ def display_round_header() -> None:
     )
 
 
-def handle_guess_input(photo: Photo) -> Tuple[Optional[int], Optional[Tuple[float, float]]]:
+def handle_guess_input(
+    photo: Photo,
+    session: GameSession,
+    is_fragment_rerun: bool = False
+) -> Tuple[Optional[int], Optional[Tuple[float, float]]]:
     """
     Gerencia entrada de chute do usuário (ano e localização)
 
     Args:
         photo: Foto atual
+        session: Partida atual
+        is_fragment_rerun: Se a execução atual é um rerun só do fragmento
 
     Returns:
         Tupla com (ano_chutado, coordenadas_chutadas)
@@ -137,9 +189,12 @@ def handle_guess_input(photo: Photo) -> Tuple[Optional[int], Optional[Tuple[floa
     st.markdown("Em que **local** você acha que a foto foi tirada?")
 
     # Se for a primeira foto, ensina como fazer o chute
-    if st.session_state.current_photo_index == 0:
+    if session.round_index == 0:
         st.warning("⚠️ Apenas UM clique permitido, escolha bem o local.")
 
+    # Alternativa ao clique no mapa (mais fácil no celular)
+    show_place_search(photo)
+
     # Criar mapa padrão do Brasil (sempre do zero, sem zoom salvo)
     m = map_handler.create_brazil_map()
 
@@ -161,13 +216,61 @@ def handle_guess_input(photo: Photo) -> Tuple[Optional[int], Optional[Tuple[floa
         clicked_lat = map_data['last_clicked']['lat']
         clicked_lon = map_data['last_clicked']['lng']
 
-        # Salvar coordenadas do chute
-        st.session_state.guess_coords = (clicked_lat, clicked_lon)
-        st.rerun()  # Força atualização para mostrar o marcador
+        # Salvar coordenadas do chute (só reroda se o clique for novo; um
+        # lugar escolhido na busca depois do clique não é sobrescrito)
+        if st.session_state.last_map_click != (clicked_lat, clicked_lon):
+            st.session_state.last_map_click = (clicked_lat, clicked_lon)
+            st.session_state.guess_coords = (clicked_lat, clicked_lon)
+            # Força atualização para mostrar o marcador, só no painel de chute
+            st.rerun(scope="fragment" if is_fragment_rerun else "app")
 
     return year_guess, st.session_state.guess_coords
 
 
+def show_place_search(photo: Photo) -> None:
+    """
+    Busca de município ou ponto de referência pelo nome; escolher um
+    resultado define o chute nas coordenadas do lugar
+
+    Args:
+        photo: Foto atual
+    """
+    query = st.text_input(
+        "Buscar lugar",
+        placeholder="Ou digite uma cidade ou ponto turístico",
+        key=f"place_search_{photo.id}",
+        label_visibility='collapsed'
+    )
+    if not query:
+        return
+
+    places = search_handler.search_places(query)
+    if not places:
+        st.caption("Nenhum lugar encontrado.")
+        return
+
+    # Rótulos são únicos: mesmo nome em UFs diferentes vira "Nome, UF"
+    places_by_label = {place.label: place for place in places}
+    select_key = f"place_choice_{photo.id}"
+    st.selectbox(
+        "Resultados",
+        options=list(places_by_label),
+        index=None,
+        placeholder="Escolha o lugar",
+        key=select_key,
+        label_visibility='collapsed',
+        on_change=choose_place,
+        args=(places_by_label, select_key)
+    )
+
+
+def choose_place(places_by_label: Dict[str, Place], select_key: str) -> None:
+    """Callback da busca: usa o lugar escolhido como chute"""
+    place = places_by_label.get(st.session_state.get(select_key))
+    if place is not None:
+        st.session_state.guess_coords = (place.latitude, place.longitude)
+
+
 def display_year_result(
     guess_year: int,
     photo: Photo,
@@ -195,76 +298,133 @@ def display_location_result(
     location_score: int,
     location_msg: str
 ) -> None:
-    """Exibe resultado do chute de localização"""
+    """Exibe resultado do chute de localização, com o município (offline)"""
     guess_lat, guess_lon = guess_coords
+    guess_place = geo_handler.reverse_geocode(guess_lat, guess_lon)
+    answer_place = get_game_engine().answer_places.get(photo.id)
+    guess_label = geo_handler.format_place(guess_place) or "Fora do Brasil"
+    answer_label = geo_handler.format_place(answer_place) or ""
 
     st.write("---")
     st.write("**:blue-background[:blue[Localização]]**")
     st.write(location_msg)
-    st.write(f"**🔵 Você chutou:** ({guess_lat:.3f}, {guess_lon:.3f})")
-    st.write(f"**🟢 Correto:** ({photo.latitude:.3f}, {photo.longitude:.3f})")
+    st.write(f"**🔵 Você chutou:** {guess_label} "
+             f"({guess_lat:.3f}, {guess_lon:.3f})")
+    st.write(f"**🟢 Correto:** {answer_label} "
+             f"({photo.latitude:.3f}, {photo.longitude:.3f})")
+    # Só quando a UF é confiável (ver geo_handler.same_state)
+    if geo_handler.same_state(guess_place, answer_place):
+        st.write(f"✅ Estado certo: {answer_place[0].state}")
     st.write(f"**Diferença:** {distance:.1f} km de distância")
     st.write(f"**Pontos:** {location_score}")
 
 
-def show_result(photo: Photo) -> None:
+def display_result_map(photo: Photo, guess_lat: float, guess_lon: float) -> None:
     """
-    Mostra o resultado do chute com pontuações e mapa
+    Exibe o mapa do resultado: por padrão uma imagem estática cacheada, com o
+    mapa interativo (folium) disponível sob demanda. Os dois mostram o mapa
+    de calor dos chutes dos outros jogadores (sem o chute do próprio
+    jogador).
 
     Args:
         photo: Foto atual
+        guess_lat, guess_lon: Coordenadas do chute
     """
-    guess_lat, guess_lon = st.session_state.guess_coords
-    guess_year = st.session_state.guess_year
+    heat_version, heat_points = heatmap_handler.get_heat_snapshot(
+        photo.id, exclude=(guess_lat, guess_lon))
 
-    # Calcular distância
-    distance = scores_handler.calculate_distance_km(
-        guess_lat, guess_lon, photo.latitude, photo.longitude
+    show_interactive = not STATIC_RESULT_MAP or st.toggle(
+        "Ver mapa interativo",
+        key=f"interactive_result_map_{photo.id}"
     )
 
-    # Calcular pontuações
-    location_score, location_msg = scores_handler.calculate_location_score(
-        distance)
-    year_score, year_msg = scores_handler.calculate_year_score(
-        guess_year, photo.year)
-    total_round_score = location_score + year_score
+    if show_interactive:
+        result_map = map_handler.create_result_map(
+            guess_lat, guess_lon, photo.latitude, photo.longitude,
+            heat_points=heat_points
+        )
+        map_handler.display_interactive_map(
+            result_map,
+            key=f"result_map_{photo.id}"
+        )
+    else:
+        st.image(map_handler.get_static_result_map(
+            photo.id, guess_lat, guess_lon, photo.latitude, photo.longitude,
+            heat_points, heat_version
+        ))
+
+
+def display_other_players_guesses(photo: Photo, guess_year: int) -> None:
+    """
+    Exibe um resumo dos chutes de ano dos outros jogadores nesta foto
+
+    Args:
+        photo: Foto atual
+        guess_year: Ano chutado pelo jogador (não entra no resumo)
+    """
+    year_histogram = heatmap_handler.get_year_histogram(
+        photo.id, exclude_year=guess_year)
+    if not year_histogram:
+        return
+
+    total_guesses = sum(year_histogram.values())
+    top_year = max(year_histogram, key=year_histogram.get)
+    chute_str = "chute" if total_guesses == 1 else "chutes"
+    st.caption(
+        f"{total_guesses} {chute_str} de outros jogadores nesta foto. Ano "
+        f"mais chutado: {top_year} ({year_histogram[top_year]}x)"
+    )
+
+
+def show_result(photo: Photo, session: GameSession) -> None:
+    """
+    Mostra o resultado do chute com pontuações e mapa
+
+    Args:
+        photo: Foto atual
+        session: Partida atual (com o resultado da rodada calculado pelo
+            GameEngine)
+    """
+    result: RoundResult = session.current_result
+    guess_lat, guess_lon = result.guess_lat, result.guess_lon
+    guess_year = result.guess_year
+    distance = result.distance_km
+
+    # Mensagens das faixas de pontuação (os pontos vêm do GameEngine)
+    _, location_msg = scores_handler.calculate_location_score(distance)
+    _, year_msg = scores_handler.calculate_year_score(guess_year, photo.year)
+    total_round_score = result.total_score
 
     # Mostrar resultados
-    display_year_result(guess_year, photo, year_score, year_msg)
-    display_location_result((guess_lat, guess_lon),
-                            photo, distance, location_score, location_msg)
+    display_year_result(guess_year, photo, result.year_score, year_msg)
+    display_location_result((guess_lat, guess_lon), photo, distance,
+                            result.location_score, location_msg)
 
     # Mapa com resultado
-    result_map = map_handler.create_result_map(
-        guess_lat, guess_lon, photo.latitude, photo.longitude
-    )
-    st.write("Seu chute _versus_ o local correto:")
-    map_handler.display_interactive_map(
-        result_map,
-        key=f"result_map_{photo.id}"
-    )
+    st.write("Seu chute _versus_ o local correto (em laranja, onde os outros "
+             "jogadores chutaram):")
+    display_result_map(photo, guess_lat, guess_lon)
+    display_other_players_guesses(photo, guess_year)
 
     # Total da rodada
     st.write("---")
     st.markdown(f"**Total de pontos nesta rodada:** {total_round_score}")
     st.markdown(
-        f"**Total de pontos acumulados:** {st.session_state.total_score}")
+        f"**Total de pontos acumulados:** {session.total_score}")
 
     # Botões de navegação
-    show_navigation_buttons(photo)
+    show_navigation_buttons(photo, session)
 
 
-def show_navigation_buttons(photo: Photo) -> None:
+def show_navigation_buttons(photo: Photo, session: GameSession) -> None:
     """
     Mostra botões de navegação (próxima foto ou finalizar)
 
     Args:
         photo: Foto atual
+        session: Partida atual
     """
-    is_last_photo = st.session_state.current_photo_index >= len(
-        st.session_state.photos) - 1
-
-    if not is_last_photo:
+    if not session.is_last_round:
         if st.button(
             "Próxima foto",
             type="primary",
@@ -279,75 +439,109 @@ def show_navigation_buttons(photo: Photo) -> None:
             key=f"finish_{photo.id}",
             use_container_width=True
         ):
-            st.session_state.game_finished = True
-            st.rerun()
+            advance_to_next_photo()
 
 
 def advance_to_next_photo() -> None:
-    """Avança para a próxima foto resetando variáveis de chute"""
-    st.session_state.current_photo_index += 1
-    st.session_state.guess_made = False
+    """
+    Avança para a próxima foto (ou para o resultado final, na última)
+    resetando variáveis de chute
+    """
+    get_game_engine().advance_round(st.session_state.game_id)
     st.session_state.guess_coords = None
-    st.session_state.guess_year = None
+    st.session_state.last_map_click = None
     st.session_state.map_zoom = None
     st.session_state.map_center = None
     st.rerun()
 
 
-def show_photo_screen(photo: Photo) -> None:
+def show_photo_screen(photo: Photo, session: GameSession) -> None:
     """
     Tela principal de jogo com foto e interface de chute
 
     Args:
         photo: Foto atual a ser exibida
+        session: Partida atual
     """
     col1, col2 = st.columns([1, 1])
 
     with col1:
-        display_round_header()
-        display_photo_info(photo, show_answer=st.session_state.guess_made)
+        display_round_header(session)
+        display_photo_info(photo, show_answer=session.guess_made)
+        startup_handler.mark(startup_handler.FIRST_PHOTO_MILESTONE)
 
     with col2:
-        if not st.session_state.guess_made:
-            year_guess, guess_coords = handle_guess_input(photo)
-
-            # Botão de submissão só aparece se houver coordenadas
-            if guess_coords:
-                if st.button(
-                    "Enviar chute",
-                    type="primary",
-                    key=f"confirm_{photo.id}",
-                    use_container_width=True
-                ):
-                    submit_guess(year_guess, guess_coords)
+        if not session.guess_made:
+            show_guess_panel(photo)
         else:
-            show_result(photo)
+            show_result_panel(photo)
+
+
+@st.fragment
+@metrics_handler.export_after_run
+@profiler_handler.profiled('guess_panel')
+def show_guess_panel(photo: Photo) -> None:
+    """
+    Painel de chute. Roda como fragmento: mexer no ano ou no mapa reroda só
+    este painel, sem recarregar a foto
+
+    Args:
+        photo: Foto atual
+    """
+    # A partida é buscada de novo: num rerun do fragmento, os argumentos são
+    # os da última execução completa
+    session = get_current_game()
+    is_fragment_rerun = rerun_handler.record_fragment_run(
+        'guess_panel', session.round_index)
+
+    year_guess, guess_coords = handle_guess_input(
+        photo, session, is_fragment_rerun)
+
+    # Botão de submissão só aparece se houver coordenadas
+    if guess_coords:
+        if st.button(
+            "Enviar chute",
+            type="primary",
+            key=f"confirm_{photo.id}",
+            use_container_width=True
+        ):
+            submit_guess(year_guess, guess_coords)
+
+
+@st.fragment
+@metrics_handler.export_after_run
+@profiler_handler.profiled('result_panel')
+def show_result_panel(photo: Photo) -> None:
+    """
+    Painel de resultado. Roda como fragmento: alternar o mapa interativo
+    reroda só este painel
+
+    Args:
+        photo: Foto atual
+    """
+    session = get_current_game()
+    rerun_handler.record_fragment_run('result_panel', session.round_index)
+    show_result(photo, session)
 
 
 def submit_guess(year_guess: int, guess_coords: Tuple[float, float]) -> None:
     """
-    Submete o chute do usuário e calcula pontuação
+    Submete o chute do usuário; a pontuação é calculada pelo GameEngine.
+    Reroda o app inteiro para revelar a resposta ao lado da foto
 
     Args:
         year_guess: Ano chutado
         guess_coords: Coordenadas chutadas
     """
-    photo = st.session_state.photos[st.session_state.current_photo_index]
-
-    # Calcular pontuações
-    distance = scores_handler.calculate_distance_km(
-        guess_coords[0], guess_coords[1],
-        photo.latitude, photo.longitude
-    )
-    location_score, _ = scores_handler.calculate_location_score(distance)
-    year_score, _ = scores_handler.calculate_year_score(year_guess, photo.year)
-    total_round_score = location_score + year_score
-
-    # Salvar chute e atualizar pontuação
-    st.session_state.guess_coords = guess_coords
-    st.session_state.guess_year = year_guess
-    st.session_state.guess_made = True
-    st.session_state.total_score += total_round_score
+    try:
+        get_game_engine().submit_guess(
+            st.session_state.game_id,
+            guess_coords[0], guess_coords[1],
+            year_guess
+        )
+    except GameError as e:
+        st.error(f"❌ {e}")
+        return
 
     st.rerun()
 
@@ -359,18 +553,16 @@ def handle_ranking_submission(player_name: str) -> None:
     Args:
         player_name: Nome do jogador
     """
-    if player_name and player_name.strip():
-        ranking_handler.add_player_score(
-            player_name.strip(),
-            st.session_state.total_score
-        )
-        st.success(f"🎊 {player_name} adicionado ao ranking!")
+    try:
+        player_rank = get_game_engine().submit_to_ranking(
+            st.session_state.game_id, player_name)
+    except GameError as e:
+        st.error(f"❌ {e}")
+        return
 
-        player_rank = ranking_handler.get_player_rank(player_name.strip())
-        if player_rank > 0:
-            st.info(f"🏆 Posição: #{player_rank}")
-    else:
-        st.error("❌ Por favor, digite um nome válido!")
+    st.success(f"🎊 {player_name} adicionado ao ranking!")
+    if player_rank > 0:
+        st.info(f"🏆 Posição: #{player_rank}")
 
 
 def display_ranking(limit: int = 10) -> None:
@@ -400,7 +592,7 @@ def display_ranking(limit: int = 10) -> None:
         st.info("Nenhum jogador no ranking ainda. Seja o primeiro!")
 
 
-def show_final_screen() -> None:
+def show_final_screen(session: GameSession) -> None:
     """Tela final com pontuação total e ranking"""
     st.balloons()
 
@@ -409,7 +601,7 @@ def show_final_screen() -> None:
     with col1:
         st.write("---")
         st.success(
-            f"**🏆 Sua pontuação final:** {st.session_state.total_score} pontos"
+            f"**🏆 Sua pontuação final:** {session.total_score} pontos"
         )
         st.write("---")
 
@@ -436,6 +628,9 @@ def show_final_screen() -> None:
             st.rerun()
 
 
+# Publica as métricas ao fim de cada execução (só se estiverem ligadas)
+@metrics_handler.export_after_run
+@profiler_handler.profiled()
 def main() -> None:
     """Função principal da aplicação"""
     # Configuração da página
@@ -445,22 +640,38 @@ def main() -> None:
         layout="wide"
     )
 
+    # Aquecimento opcional dos caches em segundo plano (uma vez por processo)
+    if startup_handler.WARMUP_ENABLED:
+        startup_handler.start_warmup([
+            lambda: photo_handler.load_photo_catalog(PHOTOS_FILE),
+            ranking_handler.load_rankings,
+            map_handler.warm_up_maps,
+        ])
+
     # Inicialização
     initialize_session_state()
 
     st.title("🇧🇷 Brasil Guessr")
 
     # Verificar se há fotos carregadas
-    if not st.session_state.photos:
+    if not load_photos():
         st.error("Nenhuma foto encontrada.")
         return
 
+    session = get_current_game()
+
+    # Contagem de reruns completos (os de fragmento são contados nos painéis)
+    rerun_handler.record_app_run(session.round_index)
+    if st.query_params.get('debug') == '1':
+        rerun_handler.display_rerun_stats()
+        profiler_handler.display_session_diagnostics(get_game_engine().store)
+
     # Fluxo do jogo
-    if not st.session_state.game_finished:
-        current_photo = st.session_state.photos[st.session_state.current_photo_index]
-        show_photo_screen(current_photo)
+    if not session.finished:
+        current_photo = get_game_engine().current_photo(session)
+        show_photo_screen(current_photo, session)
     else:
-        show_final_screen()
+        show_final_screen(session)
 
 
 if __name__ == "__main__":
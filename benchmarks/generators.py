@@ -0,0 +1,188 @@
+import random
+import string
+from typing import List, Tuple
+
+from classes.place import Place
+from classes.player import Player
+from modules.map_handler import BRAZIL_BOUNDS, BRAZIL_OUTLINE
+
+MIN_YEAR = 1800
+MAX_YEAR = 2025
+DEFAULT_SEED = 42
+
+
+def is_inside_brazil(lat: float, lon: float) -> bool:
+    """
+    Verifica se o ponto está dentro do contorno simplificado do Brasil
+    (algoritmo do raio / ray casting)
+
+    Args:
+        lat, lon: Coordenadas do ponto
+
+    Returns:
+        bool: True se o ponto está dentro do contorno
+    """
+    inside = False
+    n = len(BRAZIL_OUTLINE)
+    for i in range(n):
+        lat1, lon1 = BRAZIL_OUTLINE[i]
+        lat2, lon2 = BRAZIL_OUTLINE[(i + 1) % n]
+        if (lat1 > lat) != (lat2 > lat):
+            cross_lon = lon1 + (lat - lat1) * (lon2 - lon1) / (lat2 - lat1)
+            if lon < cross_lon:
+                inside = not inside
+    return inside
+
+
+def random_point_in_brazil(rng: random.Random) -> Tuple[float, float]:
+    """
+    Sorteia um ponto dentro do Brasil (amostragem por rejeição)
+
+    Args:
+        rng: Gerador de números aleatórios
+
+    Returns:
+        Tupla com (latitude, longitude)
+    """
+    lat_min, lat_max, lon_min, lon_max = BRAZIL_BOUNDS
+    while True:
+        lat = rng.uniform(lat_min, lat_max)
+        lon = rng.uniform(lon_min, lon_max)
+        if is_inside_brazil(lat, lon):
+            return lat, lon
+
+
+def generate_players(n: int, seed: int = DEFAULT_SEED) -> List[Player]:
+    """
+    Gera jogadores sintéticos com nomes únicos
+
+    Args:
+        n: Quantidade de jogadores
+        seed: Semente do gerador
+
+    Returns:
+        List[Player]: Jogadores gerados
+    """
+    rng = random.Random(seed)
+    players = []
+    for i in range(n):
+        games = rng.randint(1, 20)
+        score = sum(rng.randint(200, 10000) for _ in range(games))
+        players.append(Player(f"jogador_{i}", score, games))
+    return players
+
+
+def generate_photos(n: int, seed: int = DEFAULT_SEED) -> List[dict]:
+    """
+    Gera fotos sintéticas (no formato de data/photos.json) dentro do Brasil
+
+    Args:
+        n: Quantidade de fotos
+        seed: Semente do gerador
+
+    Returns:
+        List[dict]: Fotos geradas
+    """
+    rng = random.Random(seed)
+    photos = []
+    for i in range(1, n + 1):
+        lat, lon = random_point_in_brazil(rng)
+        photos.append({
+            'id': i,
+            'url': f"https://example.com/fotos/{i}.jpg",
+            'photographer': f"Fotógrafo {i % 97}",
+            'latitude': lat,
+            'longitude': lon,
+            'year': rng.randint(MIN_YEAR, MAX_YEAR),
+            'description': f"Foto sintética número {i}.",
+        })
+    return photos
+
+
+def generate_guesses(
+    n: int,
+    photos: List[dict],
+    seed: int = DEFAULT_SEED
+) -> List[Tuple[dict, float, float, int]]:
+    """
+    Gera chutes sintéticos: metade perto da resposta, metade em qualquer
+    lugar do Brasil, para exercitar todas as faixas de pontuação
+
+    Args:
+        n: Quantidade de chutes
+        photos: Fotos sobre as quais chutar
+        seed: Semente do gerador
+
+    Returns:
+        Lista de tuplas (foto, lat_chutada, lon_chutada, ano_chutado)
+    """
+    rng = random.Random(seed)
+    guesses = []
+    for i in range(n):
+        photo = photos[i % len(photos)]
+        if rng.random() < 0.5:
+            lat = photo['latitude'] + rng.gauss(0, 2)
+            lon = photo['longitude'] + rng.gauss(0, 2)
+        else:
+            lat, lon = random_point_in_brazil(rng)
+        year = min(MAX_YEAR, max(MIN_YEAR, round(rng.gauss(photo['year'], 15))))
+        guesses.append((photo, lat, lon, year))
+    return guesses
+
+
+def generate_places(n: int, seed: int = DEFAULT_SEED) -> List[Place]:
+    """
+    Gera lugares sintéticos (nomes de 1 a 4 palavras) dentro do Brasil
+
+    Args:
+        n: Quantidade de lugares
+        seed: Semente do gerador
+
+    Returns:
+        List[Place]: Lugares gerados
+    """
+    rng = random.Random(seed)
+    places = []
+    for _ in range(n):
+        words = [''.join(rng.choices(string.ascii_lowercase,
+                                     k=rng.randint(2, 9))).capitalize()
+                 for _ in range(rng.randint(1, 4))]
+        lat, lon = random_point_in_brazil(rng)
+        places.append(Place(' '.join(words), 'XX', lat, lon))
+    return places
+
+
+def generate_terms(n: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """
+    Gera termos sintéticos para a lista de bloqueio (5 a 12 letras)
+
+    Args:
+        n: Quantidade de termos
+        seed: Semente do gerador
+
+    Returns:
+        List[str]: Termos gerados, sem repetição
+    """
+    rng = random.Random(seed)
+    terms = set()
+    while len(terms) < n:
+        length = rng.randint(5, 12)
+        terms.add(''.join(rng.choices(string.ascii_lowercase, k=length)))
+    return sorted(terms)
+
+
+def generate_names(n: int, length: int, seed: int = DEFAULT_SEED) -> List[str]:
+    """
+    Gera nomes de jogador sintéticos com o tamanho pedido
+
+    Args:
+        n: Quantidade de nomes
+        length: Caracteres por nome
+        seed: Semente do gerador
+
+    Returns:
+        List[str]: Nomes gerados
+    """
+    rng = random.Random(seed)
+    alphabet = string.ascii_letters + string.digits + ' '
+    return [''.join(rng.choices(alphabet, k=length)) for _ in range(n)]
@@ -0,0 +1,304 @@
+"""
+Teste de carga: N jogadores simultâneos jogando partidas completas
+
+Cada jogador é uma sessão headless do app.py (streamlit.testing), num
+processo próprio, que chuta ano e local em todas as fotos e entra no
+ranking no final. Tudo roda localmente; o ranking, os mapas de calor, as
+estatísticas das fotos e o log de eventos ficam numa pasta temporária, sem
+tocar em data/.
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.load_test --players 8 --games 2
+"""
+import argparse
+import json
+import multiprocessing
+import os
+import random
+import re
+import statistics
+import sys
+import tempfile
+import time
+from multiprocessing import Queue
+from typing import Dict, List
+
+from streamlit.testing.v1 import AppTest
+
+from benchmarks import generators
+from modules import (difficulty_handler, event_log_handler, heatmap_handler,
+                     ranking_handler)
+
+APP_FILE = 'app.py'
+RERUN_TIMEOUT_SECONDS = 60
+
+
+class WriteCounters:
+    """
+    Contadores de escrita no ranking compartilhados entre os processos dos
+    jogadores simulados
+    """
+
+    def __init__(self, ctx):
+        self.lock = ctx.Lock()
+        self.in_flight = ctx.Value('i', 0, lock=False)
+        self.max_in_flight = ctx.Value('i', 0, lock=False)
+        self.contended = ctx.Value('i', 0, lock=False)
+        self.total = ctx.Value('i', 0, lock=False)
+
+
+def instrument_ranking_writes(counters: WriteCounters) -> None:
+    """Envolve add_player_score para medir escritas concorrentes no ranking"""
+    original = ranking_handler.add_player_score
+
+    def add_player_score(player_name: str, score: int) -> bool:
+        with counters.lock:
+            counters.total.value += 1
+            if counters.in_flight.value > 0:
+                counters.contended.value += 1
+            counters.in_flight.value += 1
+            counters.max_in_flight.value = max(
+                counters.max_in_flight.value, counters.in_flight.value)
+        try:
+            return original(player_name, score)
+        finally:
+            with counters.lock:
+                counters.in_flight.value -= 1
+
+    ranking_handler.add_player_score = add_player_score
+
+
+def _run(at: AppTest, latencies: List[float]) -> None:
+    """Executa um rerun medindo a latência"""
+    start = time.perf_counter()
+    at.run()
+    latencies.append(time.perf_counter() - start)
+
+    if at.exception:
+        raise RuntimeError(at.exception[0].message)
+
+
+def _button_with_prefix(at: AppTest, prefix: str):
+    """Busca o botão cuja chave começa com o prefixo"""
+    for button in at.button:
+        if button.key and button.key.startswith(prefix):
+            return button
+    return None
+
+
+def _forget_stale_toggles(at: AppTest) -> None:
+    """
+    Depois de trocar de rodada, o AppTest ainda guarda os toggles da tela de
+    resultado anterior, cujo estado o Streamlit já descartou. Recria esse
+    estado para que o próximo rerun não falhe.
+    """
+    for toggle in at.toggle:
+        if toggle.key and toggle.key not in at.session_state:
+            at.session_state[toggle.key] = False
+
+
+def play_game(player_name: str, rng: random.Random, latencies: List[float]) -> int:
+    """
+    Joga uma partida completa e entra no ranking
+
+    Args:
+        player_name: Nome usado no ranking
+        rng: Gerador de números aleatórios do jogador
+        latencies: Lista onde as latências dos reruns são acumuladas
+
+    Returns:
+        int: Pontuação final da partida
+    """
+    at = AppTest.from_file(APP_FILE, default_timeout=RERUN_TIMEOUT_SECONDS)
+    _run(at, latencies)
+
+    while True:
+        # Ano
+        at.number_input[0].set_value(
+            rng.randint(generators.MIN_YEAR, generators.MAX_YEAR))
+        _run(at, latencies)
+
+        # Clique no mapa (o componente do folium não roda headless, então o
+        # clique é simulado gravando as coordenadas como o app faria)
+        at.session_state.guess_coords = generators.random_point_in_brazil(rng)
+        _run(at, latencies)
+
+        _button_with_prefix(at, 'confirm_').click()
+        _run(at, latencies)
+
+        next_button = _button_with_prefix(at, 'next_')
+        if next_button is None:
+            break
+        next_button.click()
+        _run(at, latencies)
+        _forget_stale_toggles(at)
+
+    _button_with_prefix(at, 'finish_').click()
+    _run(at, latencies)
+
+    # A pontuação fica no GameEngine: é lida da tela final
+    final_score = int(re.search(r'(\d+) pontos', at.success[0].value).group(1))
+    at.text_input(key='player_name_input').set_value(player_name)
+    next(b for b in at.button if b.label == "Entrar no ranking").click()
+    _run(at, latencies)
+
+    return final_score
+
+
+def player_worker(
+    index: int,
+    games: int,
+    seed: int,
+    ranking_file: str,
+    counters: WriteCounters,
+    results: Queue
+) -> None:
+    """
+    Jogador simulado (roda num processo próprio, pois o AppTest usa um
+    runtime global por processo): joga `games` partidas seguidas
+    """
+    ranking_handler.RANKING_FILE = ranking_file
+    heatmap_handler.HEATMAP_FILE = os.path.join(
+        os.path.dirname(ranking_file), 'heatmaps.json')
+    difficulty_handler.PHOTO_STATS_FILE = os.path.join(
+        os.path.dirname(ranking_file), 'photo_stats.json')
+    event_log_handler.EVENT_LOG_DIR = os.path.join(
+        os.path.dirname(ranking_file), 'events')
+    instrument_ranking_writes(counters)
+
+    rng = random.Random(seed + index)
+    player_name = f"carga_{index}"
+    latencies: List[float] = []
+    games_completed = 0
+    expected_score = 0
+    errors = []
+
+    for _ in range(games):
+        try:
+            expected_score += play_game(player_name, rng, latencies)
+            games_completed += 1
+        except Exception as e:
+            errors.append(f"jogador {index}: {e}")
+
+    results.put({
+        'player_name': player_name,
+        'latencies': latencies,
+        'games_completed': games_completed,
+        'expected_score': expected_score,
+        'errors': errors,
+    })
+
+
+def _percentile(sorted_values: List[float], q: float) -> float:
+    if not sorted_values:
+        return 0.0
+    return sorted_values[min(len(sorted_values) - 1, int(q * len(sorted_values)))]
+
+
+def count_lost_updates(expected_scores: Dict[str, int]) -> int:
+    """Compara o ranking gravado com as pontuações esperadas"""
+    saved = {p.name: p.total_score for p in ranking_handler.load_rankings()}
+    return sum(
+        1 for name, score in expected_scores.items()
+        if saved.get(name) != score
+    )
+
+
+def run_load_test(players: int, games: int, seed: int) -> dict:
+    """
+    Roda o teste de carga
+
+    Args:
+        players: Jogadores simultâneos
+        games: Partidas por jogador
+        seed: Semente dos jogadores simulados
+
+    Returns:
+        dict: Relatório do teste
+    """
+    ctx = multiprocessing.get_context('spawn')
+    counters = WriteCounters(ctx)
+    results = ctx.Queue()
+    original_file = ranking_handler.RANKING_FILE
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ranking_file = os.path.join(tmp_dir, 'rankings.json')
+        processes = [
+            ctx.Process(
+                target=player_worker,
+                args=(i, games, seed, ranking_file, counters, results))
+            for i in range(players)
+        ]
+
+        start = time.perf_counter()
+        for process in processes:
+            process.start()
+        reports = [results.get() for _ in processes]
+        elapsed = time.perf_counter() - start
+        for process in processes:
+            process.join()
+
+        ranking_handler.RANKING_FILE = ranking_file
+        try:
+            expected_scores = {
+                r['player_name']: r['expected_score']
+                for r in reports if r['games_completed'] == games
+            }
+            lost_updates = count_lost_updates(expected_scores)
+        finally:
+            ranking_handler.RANKING_FILE = original_file
+
+    latencies = sorted(t for r in reports for t in r['latencies'])
+    games_completed = sum(r['games_completed'] for r in reports)
+    return {
+        'players': players,
+        'games_per_player': games,
+        'seed': seed,
+        'elapsed_s': elapsed,
+        'games_completed': games_completed,
+        'games_per_minute': games_completed / elapsed * 60,
+        'reruns': len(latencies),
+        'rerun_latency_s': {
+            'mean': statistics.mean(latencies) if latencies else 0.0,
+            'p50': _percentile(latencies, 0.5),
+            'p95': _percentile(latencies, 0.95),
+            'p99': _percentile(latencies, 0.99),
+            'max': latencies[-1] if latencies else 0.0,
+        },
+        'ranking_writes': {
+            'total': counters.total.value,
+            'contended': counters.contended.value,
+            'max_in_flight': counters.max_in_flight.value,
+            'lost_updates': lost_updates,
+        },
+        'errors': [e for r in reports for e in r['errors']],
+    }
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Teste de carga do Brasil Guessr")
+    parser.add_argument('--players', type=int, default=4,
+                        help="Jogadores simultâneos")
+    parser.add_argument('--games', type=int, default=1,
+                        help="Partidas por jogador")
+    parser.add_argument('--seed', type=int, default=generators.DEFAULT_SEED)
+    parser.add_argument('--output', help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    report = run_load_test(args.players, args.games, args.seed)
+
+    text = json.dumps(report, indent=2, ensure_ascii=False)
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            f.write(text)
+    print(text)
+
+    if report['errors']:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,459 @@
+"""
+Benchmarks do Brasil Guessr
+
+Uso (a partir da raiz do repositório):
+    python -m benchmarks.run_benchmarks
+    python -m benchmarks.run_benchmarks --max-players 1000000 --output resultado.json
+
+O resultado é salvo em JSON para comparar execuções ao longo do tempo.
+"""
+import argparse
+import json
+import os
+import platform
+import statistics
+import sys
+import tempfile
+import time
+from datetime import datetime
+from typing import Callable, Dict, List
+
+from benchmarks import generators
+from classes.game_engine import SESSION_TTL_SECONDS, GameEngine
+from classes.photo import Photo
+from classes.session_store import MemoryStore, SqliteStore
+from modules import (difficulty_handler, event_log_handler, geo_handler,
+                     heatmap_handler, map_handler, moderation_handler,
+                     ranking_handler, scores_handler, search_handler)
+
+RESULTS_DIR = 'benchmarks/results'
+SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 10 ** 5, 10 ** 6]
+DEFAULT_MAX_PLAYERS = 10 ** 5
+DEFAULT_MAX_PHOTOS = 10 ** 5
+SCORE_GUESSES = 2000
+MAP_REPEAT = 20
+ENGINE_GAMES = 2000
+ENGINE_ROUNDS = 5
+BLOCKLIST_SIZES = [10 ** 2, 10 ** 3, 10 ** 4, 5 * 10 ** 4]
+NAME_LENGTHS = [10, 100, 1000]
+NAMES_PER_LENGTH = 200
+# ~5.570 municípios do IBGE, mais folga para pontos de referência
+PLACE_INDEX_SIZES = [5570, 50000]
+SEARCH_QUERIES = ['s', 'sa', 'sao', 'c', 'cu', 'cur', 'b', 'be', 'belo h',
+                  'rio', 'pa', 'x']
+
+
+def measure(
+    func: Callable[[], object],
+    repeat: int = 5,
+    number: int = 1
+) -> Dict[str, float]:
+    """
+    Mede o tempo de uma função
+
+    Args:
+        func: Função sem argumentos a medir
+        repeat: Quantidade de amostras
+        number: Chamadas por amostra
+
+    Returns:
+        dict: Tempos por chamada em segundos (min, mediana, média)
+    """
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        for _ in range(number):
+            func()
+        samples.append((time.perf_counter() - start) / number)
+
+    return {
+        'min_s': min(samples),
+        'median_s': statistics.median(samples),
+        'mean_s': statistics.mean(samples),
+        'repeat': repeat,
+        'number': number,
+    }
+
+
+def _repeat_for(size: int) -> int:
+    """Menos repetições para tamanhos grandes"""
+    return 5 if size <= 10 ** 4 else 3 if size <= 10 ** 5 else 1
+
+
+def bench_scores(seed: int) -> Dict[str, dict]:
+    """Benchmarks de distância, faixas de pontuação e pontuação total"""
+    photos = generators.generate_photos(100, seed)
+    guesses = generators.generate_guesses(SCORE_GUESSES, photos, seed)
+    distances = [
+        scores_handler.calculate_distance_km(
+            lat, lon, photo['latitude'], photo['longitude'])
+        for photo, lat, lon, _ in guesses
+    ]
+
+    def distance():
+        for photo, lat, lon, _ in guesses:
+            scores_handler.calculate_distance_km(
+                lat, lon, photo['latitude'], photo['longitude'])
+
+    def location_score():
+        for d in distances:
+            scores_handler.calculate_location_score(d)
+
+    def year_score():
+        for photo, _, _, year in guesses:
+            scores_handler.calculate_year_score(year, photo['year'])
+
+    def total_score():
+        for photo, lat, lon, year in guesses:
+            scores_handler.calculate_total_score(
+                lat, lon, photo['latitude'], photo['longitude'],
+                year, photo['year'])
+
+    results = {}
+    for name, func in [('calculate_distance_km', distance),
+                       ('calculate_location_score', location_score),
+                       ('calculate_year_score', year_score),
+                       ('calculate_total_score', total_score)]:
+        result = measure(func)
+        # Normaliza para tempo por chute
+        result['per_call_s'] = result['median_s'] / len(guesses)
+        results[name] = result
+    return results
+
+
+def bench_rankings(sizes: List[int], seed: int) -> Dict[str, dict]:
+    """Benchmarks de carga, gravação, top-N e posição no ranking"""
+    results = {}
+    original_file = ranking_handler.RANKING_FILE
+
+    def load_rankings_cold():
+        ranking_handler._rankings_cache = None
+        return ranking_handler.load_rankings()
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        ranking_handler.RANKING_FILE = os.path.join(tmp_dir, 'rankings.json')
+        try:
+            for size in sizes:
+                players = generators.generate_players(size, seed)
+                middle_name = players[size // 2].name
+                repeat = _repeat_for(size)
+
+                results[str(size)] = {
+                    'save_rankings': measure(
+                        lambda: ranking_handler.save_rankings(players), repeat),
+                    # Frio (com o parse do JSON, como nas versões sem
+                    # cache) e com o arquivo já lido
+                    'load_rankings': measure(load_rankings_cold, repeat),
+                    'load_rankings_cached': measure(
+                        ranking_handler.load_rankings, repeat),
+                    'get_top_players': measure(
+                        lambda: ranking_handler.get_top_players(10), repeat),
+                    'get_player_rank': measure(
+                        lambda: ranking_handler.get_player_rank(middle_name),
+                        repeat),
+                    'add_player_score': measure(
+                        lambda: ranking_handler.add_player_score(
+                            middle_name, 1000), repeat),
+                    'file_bytes': os.path.getsize(ranking_handler.RANKING_FILE),
+                }
+                print(f"  rankings {size}: ok", file=sys.stderr)
+        finally:
+            ranking_handler.RANKING_FILE = original_file
+
+    return results
+
+
+def bench_photos(sizes: List[int], seed: int) -> Dict[str, dict]:
+    """Benchmarks de carga do catálogo de fotos (JSON + Photo.from_dict)"""
+    results = {}
+
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        path = os.path.join(tmp_dir, 'photos.json')
+        for size in sizes:
+            data = generators.generate_photos(size, seed)
+            with open(path, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+
+            def load_catalog():
+                with open(path, 'r', encoding='utf-8') as f:
+                    return [Photo.from_dict(p) for p in json.load(f)]
+
+            repeat = _repeat_for(size)
+            results[str(size)] = {
+                'from_dict': measure(
+                    lambda: [Photo.from_dict(p) for p in data], repeat),
+                'load_catalog': measure(load_catalog, repeat),
+                'file_bytes': os.path.getsize(path),
+            }
+            print(f"  fotos {size}: ok", file=sys.stderr)
+
+    return results
+
+
+def bench_maps(seed: int) -> Dict[str, dict]:
+    """Benchmarks de construção e renderização dos mapas"""
+    photos = generators.generate_photos(MAP_REPEAT, seed)
+    guesses = generators.generate_guesses(MAP_REPEAT, photos, seed)
+    photo, lat, lon, _ = guesses[0]
+    result_map = map_handler.create_result_map(
+        lat, lon, photo['latitude'], photo['longitude'])
+
+    results = {
+        'create_brazil_map': measure(
+            map_handler.create_brazil_map, MAP_REPEAT),
+        'create_result_map': measure(
+            lambda: map_handler.create_result_map(
+                lat, lon, photo['latitude'], photo['longitude']),
+            MAP_REPEAT),
+        'render_result_map_html': measure(
+            lambda: result_map.get_root().render(), MAP_REPEAT),
+        'render_result_map_svg': measure(
+            lambda: map_handler.render_result_map_svg(
+                lat, lon, photo['latitude'], photo['longitude']),
+            MAP_REPEAT),
+    }
+
+    results['get_static_result_map_cached'] = measure(
+        lambda: map_handler.get_static_result_map(
+            photo['id'], lat, lon, photo['latitude'], photo['longitude']),
+        MAP_REPEAT, 100)
+
+    return results
+
+
+def bench_geo(seed: int) -> Dict[str, dict]:
+    """
+    Geocodificação reversa offline de chutes espalhados pelo Brasil e busca
+    de lugares por prefixo (índice real e índices sintéticos maiores)
+    """
+    photos = generators.generate_photos(100, seed)
+    guesses = generators.generate_guesses(SCORE_GUESSES, photos, seed)
+
+    build = measure(
+        lambda: geo_handler.ReverseGeocoder(geo_handler.load_places()), 3)
+    geo_handler.get_geocoder()
+
+    def lookup():
+        for _, lat, lon, _ in guesses:
+            geo_handler.reverse_geocode(lat, lon)
+
+    result = measure(lookup)
+    result['per_call_s'] = result['median_s'] / len(guesses)
+    results = {'build': build, 'reverse_geocode': result}
+
+    def search_with(index):
+        def search():
+            for query in SEARCH_QUERIES:
+                index.search(query)
+        result = measure(search, 5, 100)
+        result['per_call_s'] = result['median_s'] / len(SEARCH_QUERIES)
+        return result
+
+    results['search_places'] = {
+        'bundled': search_with(search_handler.get_place_index()),
+    }
+    for size in PLACE_INDEX_SIZES:
+        places = generators.generate_places(size, seed)
+        index = search_handler.PrefixIndex(places)
+        results['search_places'][str(size)] = {
+            'build': measure(lambda: search_handler.PrefixIndex(places), 3),
+            'keys': len(index),
+            'search': search_with(index),
+        }
+    return results
+
+
+def bench_moderation(seed: int) -> Dict[str, dict]:
+    """
+    Filtro de nomes: montagem do autômato por tamanho de lista e tempo por
+    nome, que deve crescer com o nome e não com a lista
+    """
+    results = {}
+    for size in BLOCKLIST_SIZES:
+        terms = generators.generate_terms(size, seed)
+        build = measure(lambda: moderation_handler.AhoCorasick(terms), 3)
+        automaton = moderation_handler.AhoCorasick(terms)
+
+        per_length = {}
+        for length in NAME_LENGTHS:
+            names = generators.generate_names(NAMES_PER_LENGTH, length, seed)
+
+            def check():
+                for name in names:
+                    moderation_handler.find_blocked_term(name, automaton)
+
+            result = measure(check)
+            result['per_call_s'] = result['median_s'] / len(names)
+            per_length[str(length)] = result
+
+        results[str(size)] = {
+            'build': build,
+            'states': automaton.size,
+            'find_blocked_term': per_length,
+        }
+        print(f"  lista {size}: ok", file=sys.stderr)
+
+    # Falsos positivos e negativos conhecidos da lista real
+    errors = moderation_handler.self_check()
+    for error in errors:
+        print(f"  filtro: {error}", file=sys.stderr)
+    results['self_check'] = {'errors': errors}
+    return results
+
+
+def _play_games(
+    engine: GameEngine,
+    guesses: List[tuple]
+) -> Dict[str, dict]:
+    """Inicia ENGINE_GAMES partidas e joga todas as rodadas com os chutes"""
+    start = time.perf_counter()
+    game_ids = [engine.start_game().game_id for _ in range(ENGINE_GAMES)]
+    start_elapsed = time.perf_counter() - start
+
+    start = time.perf_counter()
+    for i, (_, lat, lon, year) in enumerate(guesses):
+        game_id = game_ids[i // ENGINE_ROUNDS]
+        engine.submit_guess(game_id, lat, lon, year)
+        engine.advance_round(game_id)
+    submit_elapsed = time.perf_counter() - start
+
+    return {
+        'start_game': {
+            'games': ENGINE_GAMES,
+            'per_call_s': start_elapsed / ENGINE_GAMES,
+            'per_second': ENGINE_GAMES / start_elapsed,
+        },
+        'submit_guess_and_advance': {
+            'submissions': len(guesses),
+            'per_call_s': submit_elapsed / len(guesses),
+            'per_second': len(guesses) / submit_elapsed,
+        },
+        'session_store': engine.store.stats(),
+    }
+
+
+def bench_engine(seed: int) -> Dict[str, dict]:
+    """
+    Vazão do GameEngine: partidas iniciadas e chutes pontuados por segundo,
+    com as partidas em memória e no SQLite
+    """
+    photos = [Photo.from_dict(p)
+              for p in generators.generate_photos(ENGINE_ROUNDS, seed)]
+    guesses = generators.generate_guesses(
+        ENGINE_GAMES * ENGINE_ROUNDS, [p.__dict__ for p in photos], seed)
+
+    # Agregados dos chutes num diretório temporário para não sujar data/
+    original_heatmap_file = heatmap_handler.HEATMAP_FILE
+    original_stats_file = difficulty_handler.PHOTO_STATS_FILE
+    original_event_dir = event_log_handler.EVENT_LOG_DIR
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        heatmap_handler.HEATMAP_FILE = os.path.join(tmp_dir, 'heatmaps.json')
+        difficulty_handler.PHOTO_STATS_FILE = os.path.join(
+            tmp_dir, 'photo_stats.json')
+        event_log_handler.EVENT_LOG_DIR = os.path.join(tmp_dir, 'events')
+        try:
+            engine = GameEngine(photos, store=MemoryStore(SESSION_TTL_SECONDS))
+            results = {'memory': _play_games(engine, guesses)}
+
+            sqlite_store = SqliteStore(
+                os.path.join(tmp_dir, 'sessions.db'), SESSION_TTL_SECONDS)
+            results['sqlite'] = _play_games(
+                GameEngine(photos, store=sqlite_store), guesses)
+
+            heatmap_handler.flush_heatmaps()
+            difficulty_handler.flush_photo_stats()
+            start = time.perf_counter()
+            event_log_handler.flush_events()
+            flush_elapsed = time.perf_counter() - start
+
+            # Leitura em fluxo do log gravado pelas duas rodadas acima
+            start = time.perf_counter()
+            events = sum(1 for _ in event_log_handler.iter_events())
+            results['event_log'] = {
+                'events': events,
+                'bytes': event_log_handler.get_log_stats()['bytes'],
+                'final_flush_s': flush_elapsed,
+                'read_per_second': events / (time.perf_counter() - start),
+            }
+
+            # Sorteio de rodadas com os baldes já montados pelos chutes acima
+            buckets = difficulty_handler.get_buckets(engine.photo_order)
+            results['select_rounds'] = measure(
+                lambda: difficulty_handler.select_rounds(
+                    buckets, ENGINE_ROUNDS), 5, 1000)
+        finally:
+            heatmap_handler.HEATMAP_FILE = original_heatmap_file
+            heatmap_handler.reload_heatmaps()
+            difficulty_handler.PHOTO_STATS_FILE = original_stats_file
+            difficulty_handler.reload_photo_stats()
+            event_log_handler.EVENT_LOG_DIR = original_event_dir
+
+    return results
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Benchmarks do Brasil Guessr")
+    parser.add_argument('--seed', type=int, default=generators.DEFAULT_SEED)
+    parser.add_argument('--max-players', type=int, default=DEFAULT_MAX_PLAYERS,
+                        help="Maior tamanho de ranking (até 10^6)")
+    parser.add_argument('--max-photos', type=int, default=DEFAULT_MAX_PHOTOS,
+                        help="Maior tamanho de catálogo de fotos")
+    parser.add_argument('--only', nargs='*',
+                        choices=['scores', 'rankings', 'photos', 'maps',
+                                 'geo', 'moderation', 'engine'],
+                        help="Roda só os grupos escolhidos")
+    parser.add_argument('--output', help="Arquivo JSON de saída")
+    return parser.parse_args()
+
+
+def main() -> None:
+    args = parse_args()
+    groups = set(args.only or ['scores', 'rankings', 'photos', 'maps',
+                               'geo', 'moderation', 'engine'])
+
+    results = {
+        'timestamp': datetime.now().isoformat(timespec='seconds'),
+        'seed': args.seed,
+        'python': platform.python_version(),
+        'platform': platform.platform(),
+        'benchmarks': {},
+    }
+    benchmarks = results['benchmarks']
+
+    if 'scores' in groups:
+        print("Pontuação...", file=sys.stderr)
+        benchmarks['scores'] = bench_scores(args.seed)
+    if 'rankings' in groups:
+        print("Rankings...", file=sys.stderr)
+        benchmarks['rankings'] = bench_rankings(
+            [s for s in SIZES if s <= args.max_players], args.seed)
+    if 'photos' in groups:
+        print("Catálogo de fotos...", file=sys.stderr)
+        benchmarks['photos'] = bench_photos(
+            [s for s in SIZES if s <= args.max_photos], args.seed)
+    if 'maps' in groups:
+        print("Mapas...", file=sys.stderr)
+        benchmarks['maps'] = bench_maps(args.seed)
+    if 'geo' in groups:
+        print("Geocodificação reversa...", file=sys.stderr)
+        benchmarks['geo'] = bench_geo(args.seed)
+    if 'moderation' in groups:
+        print("Filtro de nomes...", file=sys.stderr)
+        benchmarks['moderation'] = bench_moderation(args.seed)
+    if 'engine' in groups:
+        print("GameEngine...", file=sys.stderr)
+        benchmarks['engine'] = bench_engine(args.seed)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    directory = os.path.dirname(output)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(output, 'w', encoding='utf-8') as f:
+        json.dump(results, f, indent=2, ensure_ascii=False)
+    print(f"Resultados salvos em {output}", file=sys.stderr)
+
+
+if __name__ == "__main__":
+    main()
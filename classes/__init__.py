@@ -1,4 +1,12 @@
 from .photo import Photo
+from .place import Place
 from .player import Player
+from .game_session import GameSession, RoundResult
+from .photo_stats import PhotoStats, RunningStats
+from .session_profile import SessionProfile
+from .session_store import MemoryStore, SessionStore, SqliteStore
+from .game_engine import GameEngine, GameError
 
-__all__ = ['Photo', 'Player']
+__all__ = ['Photo', 'Player', 'GameSession', 'RoundResult', 'GameEngine',
+           'GameError', 'PhotoStats', 'RunningStats', 'Place',
+           'SessionStore', 'MemoryStore', 'SqliteStore', 'SessionProfile']
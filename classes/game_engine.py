@@ -0,0 +1,281 @@
+import secrets
+import threading
+import time
+from typing import Dict, List, Mapping, Optional, Sequence, Tuple
+
+from classes.game_session import GameSession, RoundResult
+from classes.photo import Photo
+from classes.place import Place
+from classes.session_store import (SessionChange, SessionStore,
+                                   create_session_store)
+from modules import (difficulty_handler, event_log_handler, geo_handler,
+                     heatmap_handler, moderation_handler, ranking_handler,
+                     scores_handler)
+
+# Tempo sem acesso até uma partida ser descartada
+SESSION_TTL_SECONDS = 2 * 60 * 60
+EVICTION_INTERVAL_SECONDS = 60
+
+# O último acesso só é regravado no store se tiver mais de N segundos
+TOUCH_INTERVAL_SECONDS = 60
+
+ROUNDS_PER_GAME = 5
+
+# Anos aceitos num chute (o registro da partida guarda o ano em 16 bits)
+MIN_YEAR = 1800
+MAX_YEAR = 2025
+
+
+class GameError(Exception):
+    """Ação inválida no estado atual da partida"""
+
+
+class GameEngine:
+    """
+    Regras do jogo, independentes da interface: rodadas, pontuação e envio
+    ao ranking. A pontuação é sempre calculada aqui (no servidor).
+
+    Attributes:
+        photos (Dict[int, Photo]): Catálogo de fotos por ID
+        photo_order (Tuple[int, ...]): IDs do catálogo, na ordem do arquivo
+        answer_places (Dict[int, Optional[Tuple[Place, bool]]]): Município
+            de cada foto (ver geo_handler.reverse_geocode), calculado uma vez
+        session_ttl (float): Segundos sem acesso até descartar uma partida
+        store (SessionStore): Onde as partidas ficam guardadas (padrão:
+            create_session_store); com um store compartilhado, qualquer
+            instância retoma qualquer partida
+        rounds_per_game (int): Rodadas de cada partida
+        difficulty_mix (Mapping[str, float]): Fração das rodadas por balde
+            de dificuldade ('easy', 'medium', 'hard')
+    """
+
+    def __init__(self, photos: Sequence[Photo],
+                 session_ttl: float = SESSION_TTL_SECONDS,
+                 rounds_per_game: int = ROUNDS_PER_GAME,
+                 difficulty_mix: Optional[Mapping[str, float]] = None,
+                 store: Optional[SessionStore] = None):
+        self.photos: Dict[int, Photo] = {p.id: p for p in photos}
+        self.photo_order: Tuple[int, ...] = tuple(p.id for p in photos)
+        self.answer_places: Dict[int, Optional[Tuple[Place, bool]]] = {
+            p.id: geo_handler.reverse_geocode(p.latitude, p.longitude)
+            for p in photos
+        }
+        self.session_ttl = session_ttl
+        self.rounds_per_game = rounds_per_game
+        self.difficulty_mix = difficulty_mix or difficulty_handler.DEFAULT_MIX
+        self.store = (store if store is not None
+                      else create_session_store(session_ttl))
+        self._ranking_lock = threading.Lock()
+        self._last_eviction = time.monotonic()
+
+    def start_game(self, photo_ids: Optional[List[int]] = None) -> GameSession:
+        """
+        Cria uma nova partida
+
+        Args:
+            photo_ids: Fotos das rodadas (padrão: sorteadas pela mistura de
+                dificuldades, da mais fácil para a mais difícil)
+
+        Returns:
+            GameSession: Partida criada
+        """
+        if photo_ids:
+            photo_ids = list(photo_ids)
+        else:
+            photo_ids = difficulty_handler.select_rounds(
+                difficulty_handler.get_buckets(self.photo_order),
+                self.rounds_per_game, self.difficulty_mix)
+        unknown = [i for i in photo_ids if i not in self.photos]
+        if not photo_ids or unknown:
+            raise GameError(f"Fotos inválidas para a partida: {unknown}")
+
+        self._maybe_evict()
+
+        session = GameSession(secrets.token_urlsafe(12), photo_ids)
+        self.store.put(session)
+        return session
+
+    def get_session(self, game_id: str) -> Optional[GameSession]:
+        """
+        Busca uma partida pelo ID
+
+        Args:
+            game_id: ID da partida
+
+        Returns:
+            GameSession ou None se não existir, tiver expirado ou usar
+            fotos que não estão mais no catálogo
+        """
+        session = self.store.get(game_id)
+        if session is None:
+            return None
+        # O catálogo pode ter sido recarregado (ou ser outro, numa instância
+        # com o mesmo store): uma partida com fotos removidas não tem como
+        # continuar
+        if not all(photo_id in self.photos for photo_id in session.photo_ids):
+            return None
+        if time.time() - session.last_access > TOUCH_INTERVAL_SECONDS:
+            # Atômico: regravar a cópia lida acima apagaria uma jogada
+            # gravada nesse meio-tempo (nesta ou em outra instância)
+            session = self.store.update(game_id, GameSession.touch)
+        return session
+
+    def _require_session(self, game_id: str) -> GameSession:
+        """Busca a partida ou lança GameError"""
+        session = self.get_session(game_id)
+        if session is None:
+            raise GameError("Partida não encontrada ou expirada.")
+        return session
+
+    def _update(self, game_id: str, change: SessionChange) -> GameSession:
+        """
+        Altera a partida atomicamente no store (ver SessionStore.update),
+        atualizando o último acesso, ou lança GameError se não existir
+        """
+        def touch_and_change(session: GameSession) -> None:
+            change(session)
+            session.touch()
+
+        session = self.store.update(game_id, touch_and_change)
+        if session is None:
+            raise GameError("Partida não encontrada ou expirada.")
+        return session
+
+    def current_photo(self, session: GameSession) -> Photo:
+        """
+        Retorna a foto da rodada atual
+
+        Args:
+            session: Partida
+
+        Returns:
+            Photo: Foto da rodada atual
+        """
+        return self.photos[session.current_photo_id]
+
+    def submit_guess(self, game_id: str, guess_lat: float, guess_lon: float,
+                     guess_year: int) -> RoundResult:
+        """
+        Registra e pontua o chute da rodada atual
+
+        Args:
+            game_id: ID da partida
+            guess_lat, guess_lon: Coordenadas chutadas
+            guess_year: Ano chutado (entre MIN_YEAR e MAX_YEAR)
+
+        Returns:
+            RoundResult: Resultado da rodada
+        """
+        if not MIN_YEAR <= guess_year <= MAX_YEAR:
+            raise GameError(
+                f"O ano deve estar entre {MIN_YEAR} e {MAX_YEAR}.")
+
+        session = self._require_session(game_id)
+        photo = self.current_photo(session)
+
+        location_score, year_score, _, distance_km = \
+            scores_handler.calculate_total_score(
+                guess_lat, guess_lon, photo.latitude, photo.longitude,
+                guess_year, photo.year
+            )
+        result = RoundResult(photo.id, guess_lat, guess_lon, guess_year,
+                             distance_km, location_score, year_score)
+
+        # A pontuação foi calculada fora da transação: confere de novo que a
+        # rodada é a mesma e ainda não tem chute (de nenhuma instância)
+        def add_result(session: GameSession) -> None:
+            if session.finished:
+                raise GameError("A partida já terminou.")
+            if session.guess_made or session.current_photo_id != photo.id:
+                raise GameError("Esta rodada já tem um chute.")
+            session.results.append(result)
+
+        session = self._update(game_id, add_result)
+
+        event_log_handler.record_round(
+            game_id, session.round_index, result, session.created_at)
+
+        # Agregados de "onde todo mundo chutou" e da dificuldade da foto
+        # (O(1) por chute)
+        heatmap_handler.record_guess(photo.id, guess_lat, guess_lon, guess_year)
+        difficulty_handler.record_result(
+            photo.id, distance_km, abs(guess_year - photo.year))
+
+        return result
+
+    def advance_round(self, game_id: str) -> GameSession:
+        """
+        Avança para a próxima rodada, ou termina a partida na última
+
+        Args:
+            game_id: ID da partida
+
+        Returns:
+            GameSession: Partida atualizada
+        """
+        def advance(session: GameSession) -> None:
+            if not session.guess_made:
+                raise GameError("Faça um chute antes de avançar.")
+            if session.is_last_round:
+                session.finished = True
+            else:
+                session.round_index += 1
+
+        session = self._update(game_id, advance)
+        return session
+
+    def submit_to_ranking(self, game_id: str, player_name: str) -> int:
+        """
+        Envia a pontuação de uma partida terminada ao ranking (uma vez)
+
+        Args:
+            game_id: ID da partida
+            player_name: Nome do jogador
+
+        Returns:
+            int: Posição do jogador no ranking (0 se não encontrado)
+        """
+        if not player_name or not player_name.strip():
+            raise GameError("Por favor, digite um nome válido!")
+        if not moderation_handler.is_name_allowed(player_name):
+            raise GameError("Esse nome não é permitido. Escolha outro!")
+
+        def mark_ranked(session: GameSession) -> None:
+            if not session.finished:
+                raise GameError("A partida ainda não terminou.")
+            if session.ranked:
+                raise GameError("Esta partida já está no ranking.")
+            session.ranked = True
+
+        session = self._update(game_id, mark_ranked)
+
+        # As escritas no arquivo de ranking são serializadas para não perder
+        # atualizações entre sessões do mesmo processo
+        with self._ranking_lock:
+            if not ranking_handler.add_player_score(
+                    player_name.strip(), session.total_score):
+                self.store.update(
+                    game_id, lambda s: setattr(s, 'ranked', False))
+                raise GameError("Erro ao salvar o ranking.")
+            return ranking_handler.get_player_rank(player_name.strip())
+
+    def evict_expired(self) -> int:
+        """
+        Descarta as partidas sem acesso há mais de session_ttl segundos
+
+        Returns:
+            int: Quantidade de partidas descartadas
+        """
+        evicted = self.store.evict_expired()
+        self._last_eviction = time.monotonic()
+        return evicted
+
+    def _maybe_evict(self) -> None:
+        """Descarta partidas expiradas no máximo a cada intervalo"""
+        if time.monotonic() - self._last_eviction >= EVICTION_INTERVAL_SECONDS:
+            self.evict_expired()
+
+    @property
+    def active_sessions(self) -> int:
+        """Quantidade de partidas guardadas"""
+        return len(self.store)
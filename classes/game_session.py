@@ -0,0 +1,190 @@
+import struct
+import time
+from typing import List, Optional
+
+# Formato binário compacto (ver GameSession.to_bytes)
+SESSION_FORMAT_VERSION = 1
+# versão, flags, rodada, nº de fotos, nº de resultados, criação,
+# último acesso, tamanho do game_id
+_HEADER = struct.Struct('<BBHHHddB')
+# foto, lat, lon, ano, distância, pontos de local, pontos de ano
+_RESULT = struct.Struct('<IddhdHH')
+_FINISHED = 1
+_RANKED = 2
+
+
+class RoundResult:
+    """
+    Attributes:
+        photo_id (int): ID da foto da rodada
+        guess_lat (float): Latitude chutada
+        guess_lon (float): Longitude chutada
+        guess_year (int): Ano chutado
+        distance_km (float): Distância entre o chute e o local correto
+        location_score (int): Pontos pela localização
+        year_score (int): Pontos pelo ano
+    """
+
+    def __init__(self, photo_id: int, guess_lat: float, guess_lon: float,
+                 guess_year: int, distance_km: float, location_score: int,
+                 year_score: int):
+        self.photo_id = photo_id
+        self.guess_lat = guess_lat
+        self.guess_lon = guess_lon
+        self.guess_year = guess_year
+        self.distance_km = distance_km
+        self.location_score = location_score
+        self.year_score = year_score
+
+    @property
+    def total_score(self) -> int:
+        """Pontuação total da rodada"""
+        return self.location_score + self.year_score
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Cria uma instância de RoundResult a partir de um dicionário"""
+        return cls(
+            photo_id=data['photo_id'],
+            guess_lat=data['guess_lat'],
+            guess_lon=data['guess_lon'],
+            guess_year=data['guess_year'],
+            distance_km=data['distance_km'],
+            location_score=data['location_score'],
+            year_score=data['year_score'],
+        )
+
+    def to_dict(self) -> dict:
+        """Converte o resultado para dicionário"""
+        return {
+            'photo_id': self.photo_id,
+            'guess_lat': self.guess_lat,
+            'guess_lon': self.guess_lon,
+            'guess_year': self.guess_year,
+            'distance_km': self.distance_km,
+            'location_score': self.location_score,
+            'year_score': self.year_score,
+            'total_score': self.total_score,
+        }
+
+
+class GameSession:
+    """
+    Attributes:
+        game_id (str): ID único da partida
+        photo_ids (List[int]): IDs das fotos, na ordem das rodadas
+        round_index (int): Índice da rodada atual (não é o id da foto)
+        results (List[RoundResult]): Resultados das rodadas já chutadas
+        finished (bool): Se a partida acabou
+        ranked (bool): Se a pontuação já foi enviada ao ranking
+        created_at (float): Momento de criação (timestamp)
+        last_access (float): Último acesso (timestamp), usado no TTL
+    """
+
+    def __init__(self, game_id: str, photo_ids: List[int],
+                 round_index: int = 0,
+                 results: Optional[List[RoundResult]] = None,
+                 finished: bool = False, ranked: bool = False,
+                 created_at: Optional[float] = None,
+                 last_access: Optional[float] = None):
+        now = time.time()
+        self.game_id = game_id
+        self.photo_ids = photo_ids
+        self.round_index = round_index
+        self.results = results if results is not None else []
+        self.finished = finished
+        self.ranked = ranked
+        self.created_at = created_at if created_at is not None else now
+        self.last_access = last_access if last_access is not None else now
+
+    @property
+    def total_rounds(self) -> int:
+        """Quantidade de rodadas da partida"""
+        return len(self.photo_ids)
+
+    @property
+    def current_photo_id(self) -> int:
+        """ID da foto da rodada atual"""
+        return self.photo_ids[self.round_index]
+
+    @property
+    def guess_made(self) -> bool:
+        """Se o jogador já chutou na rodada atual"""
+        return len(self.results) > self.round_index
+
+    @property
+    def current_result(self) -> Optional[RoundResult]:
+        """Resultado da rodada atual, ou None se ainda não houve chute"""
+        return self.results[self.round_index] if self.guess_made else None
+
+    @property
+    def is_last_round(self) -> bool:
+        """Se a rodada atual é a última"""
+        return self.round_index >= self.total_rounds - 1
+
+    @property
+    def total_score(self) -> int:
+        """Pontuação acumulada na partida"""
+        return sum(r.total_score for r in self.results)
+
+    def touch(self) -> None:
+        """Atualiza o último acesso"""
+        self.last_access = time.time()
+
+    def to_bytes(self) -> bytes:
+        """
+        Serializa a partida num registro binário compacto (algumas centenas
+        de bytes para uma partida de 5 rodadas)
+
+        Returns:
+            bytes: Registro serializado
+        """
+        game_id = self.game_id.encode('utf-8')
+        flags = (_FINISHED if self.finished else 0) | \
+                (_RANKED if self.ranked else 0)
+        parts = [
+            _HEADER.pack(SESSION_FORMAT_VERSION, flags, self.round_index,
+                         len(self.photo_ids), len(self.results),
+                         self.created_at, self.last_access, len(game_id)),
+            game_id,
+            struct.pack(f'<{len(self.photo_ids)}I', *self.photo_ids),
+        ]
+        parts.extend(
+            _RESULT.pack(r.photo_id, r.guess_lat, r.guess_lon, r.guess_year,
+                         r.distance_km, r.location_score, r.year_score)
+            for r in self.results
+        )
+        return b''.join(parts)
+
+    @classmethod
+    def from_bytes(cls, data: bytes):
+        """
+        Cria uma instância de GameSession a partir de um registro de to_bytes
+
+        Raises:
+            ValueError: se o registro for de outra versão ou estiver truncado
+        """
+        try:
+            (version, flags, round_index, photo_count, result_count,
+             created_at, last_access, id_length) = _HEADER.unpack_from(data)
+            if version != SESSION_FORMAT_VERSION:
+                raise ValueError(f"versão {version} desconhecida")
+
+            offset = _HEADER.size
+            game_id = data[offset:offset + id_length].decode('utf-8')
+            offset += id_length
+            photo_ids = list(
+                struct.unpack_from(f'<{photo_count}I', data, offset))
+            offset += 4 * photo_count
+
+            results = []
+            for _ in range(result_count):
+                results.append(RoundResult(*_RESULT.unpack_from(data, offset)))
+                offset += _RESULT.size
+        except (struct.error, UnicodeDecodeError) as e:
+            raise ValueError(f"Registro de partida inválido: {e}")
+
+        return cls(game_id, photo_ids, round_index, results,
+                   finished=bool(flags & _FINISHED),
+                   ranked=bool(flags & _RANKED),
+                   created_at=created_at, last_access=last_access)
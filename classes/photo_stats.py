@@ -0,0 +1,106 @@
+import math
+from typing import Optional
+
+
+class RunningStats:
+    """
+    Média e variância calculadas de forma incremental (Welford), sem guardar
+    as amostras. Duas instâncias podem ser combinadas (Chan et al.).
+
+    Attributes:
+        count (int): Quantidade de amostras
+        mean (float): Média das amostras
+        m2 (float): Soma dos quadrados das diferenças para a média
+    """
+
+    def __init__(self, count: int = 0, mean: float = 0.0, m2: float = 0.0):
+        self.count = count
+        self.mean = mean
+        self.m2 = m2
+
+    def add(self, value: float) -> None:
+        """Soma uma amostra, em O(1)"""
+        self.count += 1
+        delta = value - self.mean
+        self.mean += delta / self.count
+        self.m2 += delta * (value - self.mean)
+
+    def merge(self, other: 'RunningStats') -> None:
+        """Combina as amostras de outra instância nesta"""
+        if not other.count:
+            return
+        if not self.count:
+            self.count, self.mean, self.m2 = other.count, other.mean, other.m2
+            return
+
+        count = self.count + other.count
+        delta = other.mean - self.mean
+        self.mean += delta * other.count / count
+        self.m2 += other.m2 + delta * delta * self.count * other.count / count
+        self.count = count
+
+    @property
+    def variance(self) -> float:
+        """Variância amostral (0 com menos de duas amostras)"""
+        return self.m2 / (self.count - 1) if self.count > 1 else 0.0
+
+    @property
+    def stdev(self) -> float:
+        """Desvio padrão amostral"""
+        return math.sqrt(self.variance)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Cria uma instância de RunningStats a partir de um dicionário"""
+        return cls(
+            count=data['n'],
+            mean=data['mean'],
+            m2=data['m2'],
+        )
+
+    def to_dict(self) -> dict:
+        """Converte as estatísticas para dicionário"""
+        return {'n': self.count, 'mean': self.mean, 'm2': self.m2}
+
+
+class PhotoStats:
+    """
+    Attributes:
+        distance (RunningStats): Erro de distância dos chutes, em km
+        year (RunningStats): Erro de ano dos chutes, em anos
+    """
+
+    def __init__(self, distance: Optional[RunningStats] = None,
+                 year: Optional[RunningStats] = None):
+        self.distance = distance if distance is not None else RunningStats()
+        self.year = year if year is not None else RunningStats()
+
+    @property
+    def count(self) -> int:
+        """Quantidade de chutes considerados"""
+        return self.distance.count
+
+    def add(self, distance_km: float, year_error: float) -> None:
+        """Soma o erro de um chute"""
+        self.distance.add(distance_km)
+        self.year.add(year_error)
+
+    def merge(self, other: 'PhotoStats') -> None:
+        """Combina as estatísticas de outra instância nesta"""
+        self.distance.merge(other.distance)
+        self.year.merge(other.year)
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Cria uma instância de PhotoStats a partir de um dicionário"""
+        return cls(
+            distance=RunningStats.from_dict(data['distance']),
+            year=RunningStats.from_dict(data['year']),
+        )
+
+    def to_dict(self) -> dict:
+        """Converte as estatísticas para dicionário"""
+        return {
+            'distance': self.distance.to_dict(),
+            'year': self.year.to_dict(),
+        }
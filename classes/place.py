@@ -0,0 +1,39 @@
+class Place:
+    """
+    Attributes:
+        name (str): Nome do município (ou do ponto de referência)
+        state (str): Sigla da UF
+        latitude (float): Latitude da sede
+        longitude (float): Longitude da sede
+    """
+
+    def __init__(self, name: str, state: str, latitude: float,
+                 longitude: float):
+        self.name = name
+        self.state = state
+        self.latitude = latitude
+        self.longitude = longitude
+
+    @property
+    def label(self) -> str:
+        """Nome para exibição, ex.: "Curitiba, PR" """
+        return f"{self.name}, {self.state}" if self.state else self.name
+
+    @classmethod
+    def from_dict(cls, data: dict):
+        """Cria uma instância de Place a partir de um dicionário"""
+        return cls(
+            name=data['nome'],
+            state=data['uf'],
+            latitude=float(data['latitude']),
+            longitude=float(data['longitude']),
+        )
+
+    def to_dict(self) -> dict:
+        """Converte o lugar para dicionário"""
+        return {
+            'nome': self.name,
+            'uf': self.state,
+            'latitude': self.latitude,
+            'longitude': self.longitude,
+        }
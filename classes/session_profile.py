@@ -0,0 +1,71 @@
+import time
+from typing import List, Optional, Tuple
+
+
+class SessionProfile:
+    """
+    Custo de uma sessão do Streamlit (um navegador conectado): reruns,
+    tempo gasto neles e tamanho do session_state
+
+    Attributes:
+        session_id (str): ID da sessão no Streamlit
+        game_id (Optional[str]): Partida da sessão na última amostra
+        app_runs (int): Execuções completas do app
+        fragment_runs (int): Reruns só de fragmentos
+        run_seconds (float): Tempo total gasto nos reruns
+        max_run_seconds (float): Rerun mais lento
+        last_active (float): Fim do último rerun (timestamp)
+        state_bytes (int): Tamanho estimado do session_state na última
+            amostra
+        top_keys (List[Tuple[str, int]]): Maiores chaves do session_state
+            na última amostra, como (chave, bytes)
+    """
+
+    def __init__(self, session_id: str):
+        self.session_id = session_id
+        self.game_id: Optional[str] = None
+        self.app_runs = 0
+        self.fragment_runs = 0
+        self.run_seconds = 0.0
+        self.max_run_seconds = 0.0
+        self.last_active = time.time()
+        self.state_bytes = 0
+        self.top_keys: List[Tuple[str, int]] = []
+
+    @property
+    def runs(self) -> int:
+        """Total de reruns (completos e de fragmento)"""
+        return self.app_runs + self.fragment_runs
+
+    @property
+    def avg_run_seconds(self) -> float:
+        """Tempo médio de um rerun"""
+        return self.run_seconds / self.runs if self.runs else 0.0
+
+    def record_run(self, seconds: float, fragment: bool) -> None:
+        """Soma um rerun que levou `seconds` segundos"""
+        if fragment:
+            self.fragment_runs += 1
+        else:
+            self.app_runs += 1
+        self.run_seconds += seconds
+        self.max_run_seconds = max(self.max_run_seconds, seconds)
+        self.last_active = time.time()
+
+    def idle_seconds(self, now: Optional[float] = None) -> float:
+        """Segundos desde o último rerun"""
+        return (now or time.time()) - self.last_active
+
+    def to_dict(self) -> dict:
+        """Converte o perfil para dicionário (para exibição ou JSON)"""
+        return {
+            'session_id': self.session_id,
+            'game_id': self.game_id,
+            'app_runs': self.app_runs,
+            'fragment_runs': self.fragment_runs,
+            'run_seconds': round(self.run_seconds, 4),
+            'max_run_seconds': round(self.max_run_seconds, 4),
+            'idle_seconds': round(self.idle_seconds(), 1),
+            'state_bytes': self.state_bytes,
+            'top_keys': [list(item) for item in self.top_keys],
+        }
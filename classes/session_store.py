@@ -0,0 +1,286 @@
+import os
+import sqlite3
+import threading
+import time
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from typing import Callable, Dict, Optional, Tuple
+
+from classes.game_session import GameSession
+
+# Banco SQLite compartilhado entre instâncias (vazio: partidas só em memória)
+SESSION_DB = os.environ.get('BRASILGUESSR_SESSION_DB', '')
+
+MAX_MEMORY_SESSIONS = 100_000
+
+# Alteração aplicada a uma partida dentro de SessionStore.update; pode lançar
+# uma exceção para desistir sem gravar
+SessionChange = Callable[[GameSession], None]
+
+
+class SessionStore(ABC):
+    """
+    Onde as partidas ficam guardadas, como registros compactos
+    (GameSession.to_bytes). Implementações: MemoryStore e SqliteStore.
+
+    Attributes:
+        ttl (float): Segundos sem acesso até uma partida expirar
+    """
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+
+    @abstractmethod
+    def get(self, game_id: str) -> Optional[GameSession]:
+        """Partida pelo ID, ou None se não existir ou tiver expirado"""
+
+    @abstractmethod
+    def put(self, session: GameSession) -> None:
+        """Grava (ou substitui) a partida"""
+
+    @abstractmethod
+    def update(self, game_id: str,
+               change: SessionChange) -> Optional[GameSession]:
+        """
+        Lê, altera e grava a partida de forma atômica, inclusive entre
+        instâncias que compartilham o store: as verificações feitas em
+        `change` valem até a gravação
+
+        Args:
+            game_id: ID da partida
+            change: Função que altera a partida; se lançar uma exceção, nada
+                é gravado e a exceção é repassada
+
+        Returns:
+            GameSession alterada, ou None se não existir ou tiver expirado
+        """
+
+    @abstractmethod
+    def delete(self, game_id: str) -> None:
+        """Remove a partida"""
+
+    @abstractmethod
+    def evict_expired(self) -> int:
+        """Remove as partidas expiradas e retorna quantas foram removidas"""
+
+    @abstractmethod
+    def session_bytes(self, game_id: str) -> int:
+        """Tamanho do registro da partida em bytes (0 se não existir)"""
+
+    @abstractmethod
+    def stats(self) -> Dict[str, float]:
+        """Quantidade de partidas e bytes ocupados pelos registros"""
+
+    def __len__(self) -> int:
+        return int(self.stats()['sessions'])
+
+    def _expired(self, last_access: float) -> bool:
+        return time.time() - last_access > self.ttl
+
+
+class MemoryStore(SessionStore):
+    """
+    Partidas em memória, com descarte da menos usada (LRU) acima de
+    max_sessions. Só serve para uma instância.
+
+    Attributes:
+        max_sessions (int): Quantidade máxima de partidas guardadas
+    """
+
+    def __init__(self, ttl: float, max_sessions: int = MAX_MEMORY_SESSIONS):
+        super().__init__(ttl)
+        self.max_sessions = max_sessions
+        self._records: 'OrderedDict[str, Tuple[bytes, float]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+
+    def get(self, game_id: str) -> Optional[GameSession]:
+        with self._lock:
+            record = self._records.get(game_id)
+            if record is None:
+                return None
+            if self._expired(record[1]):
+                self._remove(game_id)
+                return None
+            self._records.move_to_end(game_id)
+        return GameSession.from_bytes(record[0])
+
+    def put(self, session: GameSession) -> None:
+        data = session.to_bytes()
+        with self._lock:
+            self._store(session.game_id, data, session.last_access)
+
+    def update(self, game_id: str,
+               change: SessionChange) -> Optional[GameSession]:
+        with self._lock:
+            record = self._records.get(game_id)
+            if record is None or self._expired(record[1]):
+                return None
+            session = GameSession.from_bytes(record[0])
+            change(session)
+            self._store(game_id, session.to_bytes(), session.last_access)
+        return session
+
+    def _store(self, game_id: str, data: bytes, last_access: float) -> None:
+        """Grava sem travar (quem chama já tem o lock)"""
+        self._remove(game_id)
+        self._records[game_id] = (data, last_access)
+        self._bytes += len(data)
+        while len(self._records) > self.max_sessions:
+            self._remove(next(iter(self._records)))
+
+    def delete(self, game_id: str) -> None:
+        with self._lock:
+            self._remove(game_id)
+
+    def _remove(self, game_id: str) -> None:
+        """Remove sem travar (quem chama já tem o lock)"""
+        record = self._records.pop(game_id, None)
+        if record is not None:
+            self._bytes -= len(record[0])
+
+    def evict_expired(self) -> int:
+        cutoff = time.time() - self.ttl
+        with self._lock:
+            expired = [game_id for game_id, (_, last_access)
+                       in self._records.items() if last_access < cutoff]
+            for game_id in expired:
+                self._remove(game_id)
+        return len(expired)
+
+    def session_bytes(self, game_id: str) -> int:
+        record = self._records.get(game_id)
+        return len(record[0]) if record else 0
+
+    def stats(self) -> Dict[str, float]:
+        sessions = len(self._records)
+        return {
+            'sessions': sessions,
+            'bytes': self._bytes,
+            'avg_bytes': self._bytes / sessions if sessions else 0,
+        }
+
+    def __len__(self) -> int:
+        return len(self._records)
+
+
+class SqliteStore(SessionStore):
+    """
+    Partidas num arquivo SQLite: sobrevivem a reinícios e qualquer instância
+    que aponte para o mesmo arquivo retoma qualquer partida
+
+    Attributes:
+        path (str): Caminho do banco
+    """
+
+    def __init__(self, path: str, ttl: float):
+        super().__init__(ttl)
+        self.path = path
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False,
+                                   isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.execute('PRAGMA synchronous=NORMAL')
+        self._db.execute(
+            'CREATE TABLE IF NOT EXISTS sessions ('
+            ' game_id TEXT PRIMARY KEY,'
+            ' data BLOB NOT NULL,'
+            ' last_access REAL NOT NULL)')
+        self._db.execute(
+            'CREATE INDEX IF NOT EXISTS sessions_last_access'
+            ' ON sessions (last_access)')
+
+    def get(self, game_id: str) -> Optional[GameSession]:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT data, last_access FROM sessions WHERE game_id = ?',
+                (game_id,)).fetchone()
+        if row is None:
+            return None
+        if self._expired(row[1]):
+            self.delete(game_id)
+            return None
+        return GameSession.from_bytes(row[0])
+
+    def put(self, session: GameSession) -> None:
+        data = session.to_bytes()
+        with self._lock:
+            self._db.execute(
+                'INSERT OR REPLACE INTO sessions (game_id, data, last_access)'
+                ' VALUES (?, ?, ?)',
+                (session.game_id, data, session.last_access))
+
+    def update(self, game_id: str,
+               change: SessionChange) -> Optional[GameSession]:
+        with self._lock:
+            # BEGIN IMMEDIATE reserva a escrita já na leitura: outra
+            # instância que tente alterar a mesma partida espera o COMMIT
+            self._db.execute('BEGIN IMMEDIATE')
+            try:
+                row = self._db.execute(
+                    'SELECT data, last_access FROM sessions'
+                    ' WHERE game_id = ?', (game_id,)).fetchone()
+                if row is None or self._expired(row[1]):
+                    self._db.execute('ROLLBACK')
+                    return None
+                session = GameSession.from_bytes(row[0])
+                change(session)
+                self._db.execute(
+                    'UPDATE sessions SET data = ?, last_access = ?'
+                    ' WHERE game_id = ?',
+                    (session.to_bytes(), session.last_access, game_id))
+                self._db.execute('COMMIT')
+            except BaseException:
+                self._db.execute('ROLLBACK')
+                raise
+        return session
+
+    def delete(self, game_id: str) -> None:
+        with self._lock:
+            self._db.execute('DELETE FROM sessions WHERE game_id = ?',
+                             (game_id,))
+
+    def evict_expired(self) -> int:
+        with self._lock:
+            cursor = self._db.execute(
+                'DELETE FROM sessions WHERE last_access < ?',
+                (time.time() - self.ttl,))
+        return cursor.rowcount
+
+    def session_bytes(self, game_id: str) -> int:
+        with self._lock:
+            row = self._db.execute(
+                'SELECT LENGTH(data) FROM sessions WHERE game_id = ?',
+                (game_id,)).fetchone()
+        return row[0] if row else 0
+
+    def stats(self) -> Dict[str, float]:
+        with self._lock:
+            sessions, total = self._db.execute(
+                'SELECT COUNT(*), COALESCE(SUM(LENGTH(data)), 0)'
+                ' FROM sessions').fetchone()
+        return {
+            'sessions': sessions,
+            'bytes': total,
+            'avg_bytes': total / sessions if sessions else 0,
+        }
+
+
+def create_session_store(ttl: float) -> SessionStore:
+    """
+    Store padrão: SQLite se BRASILGUESSR_SESSION_DB estiver definido, senão
+    memória
+
+    Args:
+        ttl: Segundos sem acesso até uma partida expirar
+
+    Returns:
+        SessionStore: Store configurado
+    """
+    if SESSION_DB:
+        return SqliteStore(SESSION_DB, ttl)
+    return MemoryStore(ttl)
@@ -1,3 +1,14 @@
-from . import map_handler, ranking_handler, scores_handler
+# Só módulos sem dependência do Streamlit: o GameEngine e a API HTTP
+# (server.py) importam este pacote. rerun_handler e profiler_handler usam
+# o Streamlit e são importados diretamente pelo app
+# (from modules import rerun_handler).
+from . import (difficulty_handler, event_log_handler, file_utils,
+               geo_handler, heatmap_handler, map_handler, metrics_handler,
+               moderation_handler, photo_handler, ranking_handler,
+               scores_handler, search_handler, startup_handler, text_utils)
 
-__all__ = ['scores_handler', 'map_handler', 'ranking_handler']
+__all__ = ['scores_handler', 'map_handler', 'ranking_handler',
+           'metrics_handler', 'startup_handler', 'photo_handler',
+           'heatmap_handler', 'difficulty_handler', 'moderation_handler',
+           'text_utils', 'geo_handler', 'search_handler',
+           'event_log_handler', 'file_utils']
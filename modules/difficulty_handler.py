@@ -0,0 +1,309 @@
+import json
+import random
+import threading
+from typing import Dict, List, Mapping, Optional, Sequence
+
+from classes.photo_stats import PhotoStats
+from modules.file_utils import PeriodicFlusher, merge_json_file
+from modules.metrics_handler import timed
+
+PHOTO_STATS_FILE = 'data/photo_stats.json'
+
+# Estatísticas novas são somadas ao arquivo a cada N segundos
+FLUSH_INTERVAL_SECONDS = 30.0
+
+# Erros que valem ~1000 pontos perdidos (ver limiares em scores_handler)
+DISTANCE_SCALE_KM = 1000.0
+YEAR_SCALE = 20.0
+
+# Fotos com menos chutes que isso ficam no balde do meio
+MIN_SAMPLES = 5
+
+# Baldes refeitos a cada N chutes novos (ordenar o catálogo não é por partida)
+REBUCKET_EVERY_UPDATES = 100
+
+BUCKETS = ('easy', 'medium', 'hard')
+DEFAULT_MIX = {'easy': 0.4, 'medium': 0.4, 'hard': 0.2}
+
+# _stats: visão completa (arquivo + chutes deste processo)
+# _delta: só o que este processo ainda não salvou
+_stats: Optional[Dict[int, PhotoStats]] = None
+_delta: Dict[int, PhotoStats] = {}
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+# Baldes do último catálogo: o próprio objeto do catálogo (comparado por
+# identidade, em O(1)) e a geração de chutes em que foram montados
+_buckets: Optional[Dict[str, List[int]]] = None
+_buckets_source: Optional[Sequence[int]] = None
+_buckets_generation = -1
+_updates = 0
+
+
+def _read_stats_file(path: str) -> Dict[int, PhotoStats]:
+    """Lê um arquivo de estatísticas (vazio se não existir)"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            return {int(photo_id): PhotoStats.from_dict(data)
+                    for photo_id, data in json.load(f).items()}
+    except FileNotFoundError:
+        return {}
+    except (json.JSONDecodeError, AttributeError, KeyError, ValueError) as e:
+        print(f"Erro: Arquivo {path} inválido ({e}), ignorando")
+        return {}
+
+
+def _merge_stats(target: Dict[int, PhotoStats],
+                 source: Dict[int, PhotoStats]) -> None:
+    """Soma as estatísticas de `source` em `target`"""
+    for photo_id, photo_stats in source.items():
+        target.setdefault(photo_id, PhotoStats()).merge(photo_stats)
+
+
+def _load() -> Dict[int, PhotoStats]:
+    """Carrega as estatísticas do arquivo (uma vez por processo)"""
+    global _stats
+
+    if _stats is None:
+        _stats = _read_stats_file(PHOTO_STATS_FILE)
+    return _stats
+
+
+@timed()
+def record_result(photo_id: int, distance_km: float, year_error: int) -> None:
+    """
+    Soma o erro de um chute às estatísticas da foto, em O(1)
+
+    Args:
+        photo_id: ID da foto
+        distance_km: Distância entre o chute e o local correto
+        year_error: Diferença absoluta entre o ano chutado e o correto
+    """
+    global _updates
+
+    with _lock:
+        stats = _load()
+        for table in (stats, _delta):
+            photo_stats = table.get(photo_id)
+            if photo_stats is None:
+                photo_stats = table[photo_id] = PhotoStats()
+            photo_stats.add(distance_km, abs(year_error))
+        _updates += 1
+
+    _flusher.start()
+
+
+def get_photo_stats(photo_id: int) -> Optional[PhotoStats]:
+    """
+    Retorna as estatísticas da foto
+
+    Args:
+        photo_id: ID da foto
+
+    Returns:
+        PhotoStats ou None se a foto ainda não recebeu chutes
+    """
+    with _lock:
+        return _load().get(photo_id)
+
+
+def difficulty(stats: Optional[PhotoStats]) -> Optional[float]:
+    """
+    Dificuldade de uma foto: erros médios somados em unidades de ~1000
+    pontos perdidos
+
+    Args:
+        stats: Estatísticas da foto
+
+    Returns:
+        float, ou None se a foto tiver menos de MIN_SAMPLES chutes
+    """
+    if stats is None or stats.count < MIN_SAMPLES:
+        return None
+    return (stats.distance.mean / DISTANCE_SCALE_KM +
+            stats.year.mean / YEAR_SCALE)
+
+
+@timed()
+def build_buckets(photo_ids: Sequence[int]) -> Dict[str, List[int]]:
+    """
+    Divide as fotos em terços de dificuldade. Fotos sem chutes suficientes
+    ficam em 'medium'.
+
+    Args:
+        photo_ids: IDs do catálogo
+
+    Returns:
+        dict: {'easy': [...], 'medium': [...], 'hard': [...]}
+    """
+    with _lock:
+        stats = _load()
+        scored = [(difficulty(stats.get(i)), i) for i in photo_ids]
+
+    known = sorted((d, i) for d, i in scored if d is not None)
+    buckets = {name: [] for name in BUCKETS}
+    buckets['medium'] = [i for d, i in scored if d is None]
+
+    third = len(known) / 3
+    for position, (_, photo_id) in enumerate(known):
+        buckets[BUCKETS[min(2, int(position / third))]].append(photo_id)
+    return buckets
+
+
+def get_buckets(photo_ids: Sequence[int]) -> Dict[str, List[int]]:
+    """
+    Baldes de dificuldade do catálogo, refeitos só a cada
+    REBUCKET_EVERY_UPDATES chutes novos ou quando o catálogo muda. O
+    catálogo é comparado por identidade (O(1) por partida), então passe
+    sempre o mesmo objeto imutável (ex.: GameEngine.photo_order, uma
+    tupla).
+
+    Args:
+        photo_ids: IDs do catálogo
+
+    Returns:
+        dict: {'easy': [...], 'medium': [...], 'hard': [...]}
+    """
+    global _buckets, _buckets_source, _buckets_generation
+
+    generation = _updates // REBUCKET_EVERY_UPDATES
+    if (_buckets is None or photo_ids is not _buckets_source or
+            generation != _buckets_generation):
+        _buckets = build_buckets(photo_ids)
+        _buckets_source, _buckets_generation = photo_ids, generation
+    return _buckets
+
+
+def _bucket_counts(rounds: int, mix: Mapping[str, float]) -> Dict[str, int]:
+    """Quantas rodadas de cada balde (maiores restos)"""
+    total = sum(mix.get(name, 0) for name in BUCKETS) or 1
+    exact = {name: rounds * mix.get(name, 0) / total for name in BUCKETS}
+    counts = {name: int(value) for name, value in exact.items()}
+
+    leftover = rounds - sum(counts.values())
+    by_remainder = sorted(BUCKETS, key=lambda n: exact[n] - counts[n],
+                          reverse=True)
+    for name in by_remainder[:leftover]:
+        counts[name] += 1
+    return counts
+
+
+@timed()
+def select_rounds(
+    buckets: Mapping[str, Sequence[int]],
+    rounds: int,
+    mix: Mapping[str, float] = DEFAULT_MIX,
+    rng: random.Random = random
+) -> List[int]:
+    """
+    Sorteia as fotos de uma partida com a mistura de dificuldades pedida,
+    em O(rodadas). Se um balde não tiver fotos suficientes, completa com
+    os baldes vizinhos. As rodadas ficam em ordem crescente de dificuldade.
+
+    Args:
+        buckets: Baldes de dificuldade (ver get_buckets)
+        rounds: Quantidade de rodadas
+        mix: Fração das rodadas por balde
+        rng: Gerador de números aleatórios
+
+    Returns:
+        List[int]: IDs das fotos, sem repetição
+    """
+    rounds = min(rounds, sum(len(b) for b in buckets.values()))
+    counts = _bucket_counts(rounds, mix)
+
+    chosen = {name: [] for name in BUCKETS}
+    missing = 0
+    for name in BUCKETS:
+        bucket = buckets.get(name, ())
+        take = min(counts[name], len(bucket))
+        chosen[name] = rng.sample(bucket, take)
+        missing += counts[name] - take
+
+    # Falta de fotos num balde: tenta o do meio primeiro, depois os extremos
+    for name in ('medium', 'easy', 'hard'):
+        if not missing:
+            break
+        bucket = buckets.get(name, ())
+        free = len(bucket) - len(chosen[name])
+        if free <= 0:
+            continue
+        taken = set(chosen[name])
+        extra = [i for i in rng.sample(bucket, len(taken) + min(free, missing))
+                 if i not in taken][:missing]
+        chosen[name].extend(extra)
+        missing -= len(extra)
+
+    return [i for name in BUCKETS for i in chosen[name]]
+
+
+def flush_photo_stats() -> bool:
+    """
+    Soma ao arquivo os chutes ainda não salvos por este processo. O arquivo
+    é relido e regravado com uma trava entre processos, então instâncias
+    diferentes não apagam os dados umas das outras.
+
+    Returns:
+        bool: True se salvou com sucesso
+    """
+    global _stats, _delta
+
+    # Serializa os flushes deste processo (thread periódica e saída)
+    with _flush_lock:
+        with _lock:
+            if not _delta:
+                return True
+            delta, _delta = _delta, {}
+
+        try:
+            merged = merge_json_file(
+                PHOTO_STATS_FILE, delta, _read_stats_file, _merge_stats,
+                lambda stats: {str(i): s.to_dict() for i, s in stats.items()})
+        except Exception as e:
+            print(f"Erro ao salvar estatísticas das fotos: {e}")
+            with _lock:
+                _merge_stats(_delta, delta)
+            return False
+
+        # Inclui as estatísticas salvas pelas outras instâncias e as que
+        # chegaram durante a gravação
+        with _lock:
+            _merge_stats(merged, _delta)
+            _stats = merged
+        return True
+
+
+def merge_stats_file(path: str) -> int:
+    """
+    Combina as estatísticas de outro arquivo (ex.: de outra instância)
+    nas deste processo; serão salvas no próximo flush
+
+    Args:
+        path: Caminho do arquivo a combinar
+
+    Returns:
+        int: Quantidade de fotos combinadas
+    """
+    other = _read_stats_file(path)
+    with _lock:
+        stats = _load()
+        for photo_id, photo_stats in other.items():
+            for table in (stats, _delta):
+                table.setdefault(photo_id, PhotoStats()).merge(
+                    PhotoStats.from_dict(photo_stats.to_dict()))
+    return len(other)
+
+
+def reload_photo_stats() -> None:
+    """Descarta as estatísticas em memória; serão relidas de PHOTO_STATS_FILE"""
+    global _stats, _buckets, _buckets_source, _updates
+
+    with _lock:
+        _stats = None
+        _delta.clear()
+        _buckets = _buckets_source = None
+        _updates = 0
+
+
+_flusher = PeriodicFlusher('brasilguessr-photo-stats', flush_photo_stats,
+                           FLUSH_INTERVAL_SECONDS)
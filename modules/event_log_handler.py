@@ -0,0 +1,282 @@
+import heapq
+import json
+import os
+import threading
+import time
+from typing import Dict, Iterator, List, Optional
+
+from classes.game_session import RoundResult
+from modules.file_utils import PeriodicFlusher
+from modules.metrics_handler import timed
+
+# Log de eventos de rodada (JSONL), para análise, replay e recálculo de
+# pontuação. BRASILGUESSR_EVENT_LOG=0 desliga.
+EVENT_LOG_ENABLED = os.environ.get('BRASILGUESSR_EVENT_LOG', '1') != '0'
+EVENT_LOG_DIR = 'data/events'
+
+# Cada processo escreve nos seus próprios segmentos:
+# events-<início em ms>-<pid>.jsonl, com no máximo MAX_SEGMENT_BYTES
+MAX_SEGMENT_BYTES = 8 * 1024 * 1024
+SEGMENT_PREFIX = 'events-'
+SEGMENT_SUFFIX = '.jsonl'
+
+# Retenção: ao abrir um segmento novo, apaga os mais antigos que
+# MAX_SEGMENT_AGE_DAYS e os que passarem de MAX_SEGMENTS (~1 GB no total)
+MAX_SEGMENTS = 128
+MAX_SEGMENT_AGE_DAYS = 30
+
+# Escritas em lote por uma thread, fora do caminho do chute
+FLUSH_INTERVAL_SECONDS = 2.0
+FLUSH_BATCH_SIZE = 500
+
+# Se o disco falhar, os eventos voltam ao buffer até este limite; acima
+# dele, os mais antigos são descartados
+MAX_BUFFERED_EVENTS = 50_000
+
+_buffer: List[dict] = []
+_lock = threading.Lock()
+_write_lock = threading.Lock()
+_segment_path: Optional[str] = None
+_segment_bytes = 0
+_last_time = 0.0
+_dropped = 0
+
+
+@timed()
+def record_round(
+    game_id: str,
+    round_index: int,
+    result: RoundResult,
+    started_at: float
+) -> None:
+    """
+    Registra o chute de uma rodada; só guarda no buffer (O(1)), quem grava
+    no disco é a thread de flush
+
+    Args:
+        game_id: ID da partida
+        round_index: Índice da rodada
+        result: Resultado da rodada
+        started_at: Início da partida (timestamp)
+    """
+    global _last_time
+
+    if not EVENT_LOG_ENABLED:
+        return
+
+    # Chaves curtas: o log cresce com cada chute
+    fields = {
+        's': round(started_at, 3),
+        'g': game_id,
+        'r': round_index,
+        'p': result.photo_id,
+        'la': round(result.guess_lat, 6),
+        'lo': round(result.guess_lon, 6),
+        'y': result.guess_year,
+        'd': round(result.distance_km, 3),
+        'ls': result.location_score,
+        'ys': result.year_score,
+    }
+
+    # O tempo é dado sob o lock (e nunca volta, mesmo se o relógio voltar):
+    # cada segmento fica em ordem de 't', como _read_segment e iter_events
+    # supõem
+    with _lock:
+        _last_time = max(_last_time, round(time.time(), 3))
+        _buffer.append({'t': _last_time, **fields})
+        pending = len(_buffer)
+
+    _flusher.start()
+    if pending >= FLUSH_BATCH_SIZE:
+        _flusher.wake()
+
+
+def _new_segment_path(first_event_time: float) -> str:
+    """Caminho de um segmento novo deste processo"""
+    return os.path.join(
+        EVENT_LOG_DIR,
+        f"{SEGMENT_PREFIX}{int(first_event_time * 1000)}-{os.getpid()}"
+        f"{SEGMENT_SUFFIX}"
+    )
+
+
+def flush_events() -> int:
+    """
+    Grava no segmento atual os eventos do buffer, abrindo um segmento novo
+    quando o atual passa de MAX_SEGMENT_BYTES
+
+    Returns:
+        int: Quantidade de eventos gravados
+    """
+    global _buffer, _segment_path, _segment_bytes, _dropped
+
+    # Um flush por vez, para os segmentos ficarem em ordem de tempo
+    with _write_lock:
+        with _lock:
+            if not _buffer:
+                return 0
+            events, _buffer = _buffer, []
+
+        data = ''.join(
+            json.dumps(e, separators=(',', ':')) + '\n' for e in events
+        ).encode('utf-8')
+
+        try:
+            os.makedirs(EVENT_LOG_DIR, exist_ok=True)
+            if (_segment_path is None or
+                    os.path.dirname(_segment_path) != EVENT_LOG_DIR or
+                    _segment_bytes + len(data) > MAX_SEGMENT_BYTES):
+                _segment_path = _new_segment_path(events[0]['t'])
+                _segment_bytes = 0
+                prune_segments(keep=_segment_path)
+
+            with open(_segment_path, 'ab') as f:
+                f.write(data)
+            _segment_bytes += len(data)
+            return len(events)
+        except OSError as e:
+            print(f"Erro ao gravar o log de eventos: {e}")
+            # Devolve ao buffer para tentar de novo no próximo flush, sem
+            # deixá-lo crescer sem limite enquanto o disco falhar
+            with _lock:
+                _buffer = events + _buffer
+                excess = len(_buffer) - MAX_BUFFERED_EVENTS
+                if excess > 0:
+                    del _buffer[:excess]
+                    _dropped += excess
+            return 0
+
+
+def prune_segments(
+    keep: Optional[str] = None,
+    directory: Optional[str] = None
+) -> int:
+    """
+    Apaga os segmentos mais antigos que MAX_SEGMENT_AGE_DAYS (pela última
+    modificação) e, depois, os mais antigos além de MAX_SEGMENTS
+
+    Args:
+        keep: Segmento que nunca é apagado (o que está sendo escrito)
+        directory: Pasta do log (padrão: EVENT_LOG_DIR)
+
+    Returns:
+        int: Quantidade de segmentos apagados
+    """
+    segments = [path for path in list_segments(directory) if path != keep]
+    cutoff = time.time() - MAX_SEGMENT_AGE_DAYS * 24 * 60 * 60
+    excess = len(segments) + (keep is not None) - MAX_SEGMENTS
+
+    removed = 0
+    for index, path in enumerate(segments):
+        try:
+            if index < excess or os.path.getmtime(path) < cutoff:
+                os.remove(path)
+                removed += 1
+        except OSError:
+            pass  # já apagado por outro processo
+    return removed
+
+
+def _segment_start(path: str) -> Optional[float]:
+    """Início de um segmento (pelo nome), ou None se não for um segmento"""
+    name = os.path.basename(path)
+    if not name.startswith(SEGMENT_PREFIX) or \
+            not name.endswith(SEGMENT_SUFFIX):
+        return None
+    start = name[len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)].split('-')[0]
+    return int(start) / 1000 if start.isdigit() else None
+
+
+def list_segments(directory: Optional[str] = None) -> List[str]:
+    """
+    Segmentos do log, do mais antigo para o mais novo
+
+    Args:
+        directory: Pasta do log (padrão: EVENT_LOG_DIR)
+
+    Returns:
+        List[str]: Caminhos dos segmentos
+    """
+    directory = directory or EVENT_LOG_DIR
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return []
+
+    segments = sorted(
+        (_segment_start(name), os.path.join(directory, name))
+        for name in names if _segment_start(name) is not None
+    )
+    return [path for _, path in segments]
+
+
+def _read_segment(
+    path: str,
+    start: Optional[float],
+    end: Optional[float]
+) -> Iterator[dict]:
+    """Lê um segmento linha a linha, só os eventos do intervalo"""
+    with open(path, 'r', encoding='utf-8') as f:
+        for line in f:
+            try:
+                event = json.loads(line)
+            except json.JSONDecodeError:
+                continue  # linha cortada por um processo encerrado no meio
+            t = event.get('t', 0)
+            if start is not None and t < start:
+                continue
+            if end is not None and t >= end:
+                break  # cada segmento está em ordem de tempo
+            yield event
+
+
+def iter_events(
+    start: Optional[float] = None,
+    end: Optional[float] = None,
+    directory: Optional[str] = None
+) -> Iterator[dict]:
+    """
+    Percorre os eventos com start <= t < end em ordem de tempo, lendo os
+    segmentos em fluxo (sem carregar arquivos inteiros). Segmentos fora do
+    intervalo nem são abertos.
+
+    Args:
+        start, end: Intervalo de tempo (timestamps); None = sem limite
+        directory: Pasta do log (padrão: EVENT_LOG_DIR)
+
+    Yields:
+        dict: Eventos (chaves curtas, como em record_round: t, s, g, r, p,
+        la, lo, y, d, ls, ys)
+    """
+    streams = []
+    for path in list_segments(directory):
+        if end is not None and _segment_start(path) >= end:
+            continue
+        # O último evento de um segmento é anterior à sua modificação
+        if start is not None and os.path.getmtime(path) < start:
+            continue
+        streams.append(_read_segment(path, start, end))
+
+    # Segmentos de processos diferentes se sobrepõem no tempo
+    return heapq.merge(*streams, key=lambda e: e['t'])
+
+
+def get_log_stats(directory: Optional[str] = None) -> Dict[str, int]:
+    """
+    Tamanho do log
+
+    Returns:
+        dict: Segmentos, bytes em disco, eventos ainda no buffer e eventos
+        descartados por falhas de escrita
+    """
+    segments = list_segments(directory)
+    return {
+        'segments': len(segments),
+        'bytes': sum(os.path.getsize(p) for p in segments),
+        'buffered': len(_buffer),
+        'dropped': _dropped,
+    }
+
+
+_flusher = PeriodicFlusher('brasilguessr-events', flush_events,
+                           FLUSH_INTERVAL_SECONDS)
@@ -0,0 +1,151 @@
+import atexit
+import json
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterator, Optional
+
+try:
+    import fcntl
+except ImportError:  # Windows: sem trava entre processos
+    fcntl = None
+
+LOCK_SUFFIX = '.lock'
+
+
+@contextmanager
+def file_lock(path: str) -> Iterator[None]:
+    """
+    Trava exclusiva entre processos (flock em `<path>.lock`), para
+    ler-combinar-gravar um arquivo compartilhado sem perder as escritas de
+    outras instâncias
+
+    Args:
+        path: Arquivo protegido pela trava
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with open(f"{path}{LOCK_SUFFIX}", 'a') as lock:
+        if fcntl is not None:
+            fcntl.flock(lock.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(lock.fileno(), fcntl.LOCK_UN)
+
+
+def write_json_atomic(path: str, data: Any) -> None:
+    """
+    Grava JSON compacto num temporário único e o renomeia por cima do
+    arquivo, para nunca expor um arquivo pela metade
+
+    Args:
+        path: Caminho do arquivo
+        data: Dados serializáveis em JSON
+
+    Raises:
+        OSError: se não conseguir gravar
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+
+    with tempfile.NamedTemporaryFile(
+            'w', encoding='utf-8', dir=directory or '.',
+            prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+            delete=False) as f:
+        tmp_path = f.name
+        try:
+            json.dump(data, f, separators=(',', ':'))
+        except BaseException:
+            f.close()
+            os.remove(tmp_path)
+            raise
+    try:
+        os.replace(tmp_path, path)
+    except OSError:
+        os.remove(tmp_path)
+        raise
+
+
+def merge_json_file(
+    path: str,
+    delta: Dict[Any, Any],
+    read: Callable[[str], Dict[Any, Any]],
+    merge: Callable[[Dict[Any, Any], Dict[Any, Any]], None],
+    serialize: Callable[[Dict[Any, Any]], Any]
+) -> Dict[Any, Any]:
+    """
+    Soma `delta` a um arquivo JSON compartilhado entre instâncias: relê o
+    arquivo, combina e regrava, tudo sob file_lock, para nenhuma instância
+    apagar o que as outras salvaram
+
+    Args:
+        path: Caminho do arquivo
+        delta: O que este processo ainda não salvou
+        read: Lê o arquivo (vazio se não existir)
+        merge: Soma o segundo argumento no primeiro
+        serialize: Converte o resultado para JSON
+
+    Returns:
+        dict: O que ficou gravado (arquivo + delta)
+
+    Raises:
+        OSError: se não conseguir gravar
+    """
+    with file_lock(path):
+        merged = read(path)
+        merge(merged, delta)
+        write_json_atomic(path, serialize(merged))
+    return merged
+
+
+class PeriodicFlusher:
+    """
+    Thread em segundo plano que chama `flush` a cada `interval` segundos
+    (ou antes, com wake()), fora do caminho das requisições. A thread só
+    nasce no primeiro start(); `flush` também roda ao encerrar o processo.
+
+    Attributes:
+        name (str): Nome da thread
+        interval (float): Segundos entre flushes
+    """
+
+    def __init__(self, name: str, flush: Callable[[], Any],
+                 interval: float):
+        self.name = name
+        self.interval = interval
+        self._flush = flush
+        self._thread: Optional[threading.Thread] = None
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        # Não perde o que ainda não foi salvo ao encerrar o processo
+        atexit.register(flush)
+
+    def start(self) -> None:
+        """Inicia a thread, se ainda não estiver rodando (O(1) depois)"""
+        if self._thread is not None:
+            return
+
+        with self._lock:
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._run, name=self.name, daemon=True)
+                self._thread.start()
+
+    def wake(self) -> None:
+        """Antecipa o próximo flush"""
+        self._wake.set()
+
+    def _run(self) -> None:
+        while True:
+            self._wake.wait(self.interval)
+            self._wake.clear()
+            try:
+                self._flush()
+            except Exception as e:
+                print(f"Erro no flush de {self.name}: {e}")
@@ -0,0 +1,361 @@
+import csv
+import json
+import math
+import os
+from functools import lru_cache
+from typing import Dict, List, Optional, Sequence, Tuple
+
+from classes.place import Place
+from modules.map_handler import BRAZIL_OUTLINE
+from modules.metrics_handler import timed
+
+MUNICIPALITIES_FILE = 'data/geo/municipios.csv'
+
+# Contornos opcionais (GeoJSON do IBGE, com as propriedades de nome e UF).
+# Sem eles, o lugar é aproximado pela sede de município mais próxima.
+MUNICIPALITY_POLYGONS_FILE = 'data/geo/municipios.geojson'
+STATE_POLYGONS_FILE = 'data/geo/estados.geojson'
+
+NAME_PROPERTIES = ('nome', 'name', 'NM_MUN', 'NM_UF')
+STATE_PROPERTIES = ('uf', 'sigla', 'SIGLA_UF', 'SIGLA', 'UF')
+
+# Grade do índice espacial e distância máxima até uma sede
+GRID_CELL_DEG = 1.0
+MAX_NEAREST_KM = 1500.0
+KM_PER_DEG = 111.32
+
+# Fora do contorno simplificado do Brasil (ilhas, litoral recortado), só
+# vale uma sede bem próxima
+OUTSIDE_OUTLINE_MAX_KM = 50.0
+
+# Anel: lista de (lon, lat); polígono: anel externo seguido dos buracos
+Ring = List[Tuple[float, float]]
+Polygon = List[Ring]
+
+_BRAZIL_RING: Ring = [(lon, lat) for lat, lon in BRAZIL_OUTLINE]
+
+
+def load_places(path: str = MUNICIPALITIES_FILE) -> List[Place]:
+    """
+    Lê as sedes de município (CSV com nome, uf, latitude, longitude)
+
+    Args:
+        path: Caminho do arquivo CSV
+
+    Returns:
+        List[Place]: Lugares lidos (vazio se o arquivo não existir)
+    """
+    try:
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            return [Place.from_dict(row) for row in csv.DictReader(f)]
+    except FileNotFoundError:
+        print(f"Aviso: {path} não encontrado")
+        return []
+
+
+def _property(properties: dict, keys: Sequence[str]) -> str:
+    """Primeira propriedade presente dentre as chaves aceitas"""
+    for key in keys:
+        if properties.get(key):
+            return str(properties[key])
+    return ''
+
+
+def load_polygons(path: str) -> List[Tuple[str, str, List[Polygon]]]:
+    """
+    Lê contornos de um GeoJSON (Polygon ou MultiPolygon)
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        Lista de (nome, uf, polígonos); vazia se o arquivo não existir
+    """
+    if not os.path.exists(path):
+        return []
+
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            features = json.load(f).get('features', [])
+    except (json.JSONDecodeError, AttributeError) as e:
+        print(f"Erro: Arquivo {path} inválido ({e})")
+        return []
+
+    regions = []
+    for feature in features:
+        geometry = feature.get('geometry') or {}
+        if geometry.get('type') == 'Polygon':
+            polygons = [geometry['coordinates']]
+        elif geometry.get('type') == 'MultiPolygon':
+            polygons = geometry['coordinates']
+        else:
+            continue
+
+        properties = feature.get('properties') or {}
+        regions.append((
+            _property(properties, NAME_PROPERTIES),
+            _property(properties, STATE_PROPERTIES),
+            [[[(float(x), float(y)) for x, y, *_ in ring] for ring in polygon]
+             for polygon in polygons],
+        ))
+    return regions
+
+
+def _point_in_ring(lon: float, lat: float, ring: Ring) -> bool:
+    """Ponto dentro de um anel (algoritmo do raio / ray casting)"""
+    inside = False
+    x1, y1 = ring[-1]
+    for x2, y2 in ring:
+        if (y2 > lat) != (y1 > lat):
+            if lon < (x1 - x2) * (lat - y2) / (y1 - y2) + x2:
+                inside = not inside
+        x1, y1 = x2, y2
+    return inside
+
+
+def _cell(lat: float, lon: float) -> Tuple[int, int]:
+    """Célula da grade que contém o ponto"""
+    return (int(math.floor(lat / GRID_CELL_DEG)),
+            int(math.floor(lon / GRID_CELL_DEG)))
+
+
+class PolygonIndex:
+    """
+    Regiões (municípios ou estados) indexadas por uma grade de caixas
+    envolventes: só os polígonos cuja caixa cobre a célula do ponto são
+    testados
+
+    Attributes:
+        regions (List[Tuple[str, str, List[Polygon]]]): (nome, uf, polígonos)
+    """
+
+    def __init__(self, regions: List[Tuple[str, str, List[Polygon]]]):
+        self.regions = regions
+        # Caixa de cada polígono: (lon_min, lat_min, lon_max, lat_max)
+        self._boxes: List[Tuple[int, Polygon, Tuple[float, ...]]] = []
+        self._grid: Dict[Tuple[int, int], List[int]] = {}
+
+        for region_index, (_, _, polygons) in enumerate(regions):
+            for polygon in polygons:
+                xs = [x for x, _ in polygon[0]]
+                ys = [y for _, y in polygon[0]]
+                box = (min(xs), min(ys), max(xs), max(ys))
+                box_index = len(self._boxes)
+                self._boxes.append((region_index, polygon, box))
+
+                row_min, col_min = _cell(box[1], box[0])
+                row_max, col_max = _cell(box[3], box[2])
+                for row in range(row_min, row_max + 1):
+                    for col in range(col_min, col_max + 1):
+                        self._grid.setdefault((row, col), []).append(box_index)
+
+    def find(self, lat: float, lon: float) -> Optional[Tuple[str, str]]:
+        """
+        Região que contém o ponto
+
+        Args:
+            lat, lon: Coordenadas
+
+        Returns:
+            Tupla com (nome, uf), ou None se nenhuma região contém o ponto
+        """
+        for box_index in self._grid.get(_cell(lat, lon), ()):
+            region_index, polygon, (x_min, y_min, x_max, y_max) = \
+                self._boxes[box_index]
+            if not (x_min <= lon <= x_max and y_min <= lat <= y_max):
+                continue
+            if (_point_in_ring(lon, lat, polygon[0]) and
+                    not any(_point_in_ring(lon, lat, hole)
+                            for hole in polygon[1:])):
+                name, state, _ = self.regions[region_index]
+                return name, state
+        return None
+
+
+class PlaceIndex:
+    """
+    Lugares (sedes de município) numa grade, para achar o mais próximo
+    olhando só as células vizinhas
+
+    Attributes:
+        places (List[Place]): Lugares indexados
+    """
+
+    def __init__(self, places: Sequence[Place]):
+        self.places = list(places)
+        self._grid: Dict[Tuple[int, int], List[Place]] = {}
+        for place in self.places:
+            self._grid.setdefault(
+                _cell(place.latitude, place.longitude), []).append(place)
+
+    def nearest(
+        self,
+        lat: float,
+        lon: float,
+        state: Optional[str] = None,
+        max_km: float = MAX_NEAREST_KM
+    ) -> Optional[Tuple[Place, float]]:
+        """
+        Lugar mais próximo do ponto, procurando em anéis de células
+
+        Args:
+            lat, lon: Coordenadas
+            state: Se informado, só considera lugares dessa UF
+            max_km: Distância máxima
+
+        Returns:
+            Tupla com (lugar, distância aproximada em km), ou None
+        """
+        cos_lat = math.cos(math.radians(lat))
+        # Largura mínima de uma célula em km: anéis além disso não melhoram
+        cell_km = GRID_CELL_DEG * KM_PER_DEG * max(cos_lat, 0.1)
+        row, col = _cell(lat, lon)
+
+        best, best_km = None, max_km
+        ring = 0
+        while (ring - 1) * cell_km <= best_km:
+            for r in range(row - ring, row + ring + 1):
+                for c in range(col - ring, col + ring + 1):
+                    if max(abs(r - row), abs(c - col)) != ring:
+                        continue
+                    for place in self._grid.get((r, c), ()):
+                        if state and place.state != state:
+                            continue
+                        dx = (place.longitude - lon) * cos_lat
+                        dy = place.latitude - lat
+                        km = math.hypot(dx, dy) * KM_PER_DEG
+                        if km <= best_km:
+                            best, best_km = place, km
+            ring += 1
+
+        return (best, best_km) if best is not None else None
+
+
+class ReverseGeocoder:
+    """
+    Geocodificação reversa offline: município e UF de um ponto
+
+    Usa os contornos de municípios e estados quando existem; senão (ou se o
+    ponto não cair em nenhum município), a sede mais próxima, restrita à UF
+    do ponto quando os contornos de estados estão disponíveis. Sem eles, o
+    contorno simplificado do Brasil separa o que está fora do país.
+    """
+
+    def __init__(self, places: Sequence[Place],
+                 municipality_regions=(), state_regions=()):
+        self.places = PlaceIndex(places)
+        self.municipalities = PolygonIndex(list(municipality_regions))
+        self.states = PolygonIndex(list(state_regions))
+        self._by_name = {(p.name, p.state): p for p in places}
+
+    def lookup(self, lat: float, lon: float) -> Optional[Tuple[Place, bool]]:
+        """
+        Município do ponto
+
+        Args:
+            lat, lon: Coordenadas
+
+        Returns:
+            Tupla com (lugar, exato): exato é False quando o lugar é só a
+            sede mais próxima. None se estiver fora do Brasil.
+        """
+        municipality = self.municipalities.find(lat, lon)
+        if municipality is not None:
+            name, state = municipality
+            place = self._by_name.get((name, state))
+            return place or Place(name, state, lat, lon), True
+
+        state, max_km = None, MAX_NEAREST_KM
+        if self.states.regions:
+            region = self.states.find(lat, lon)
+            if region is None:
+                return None
+            state = region[1]
+        elif not _point_in_ring(lon, lat, _BRAZIL_RING):
+            max_km = OUTSIDE_OUTLINE_MAX_KM
+
+        nearest = self.places.nearest(lat, lon, state, max_km)
+        return (nearest[0], False) if nearest else None
+
+
+@lru_cache(maxsize=1)
+def get_geocoder() -> ReverseGeocoder:
+    """
+    Monta o geocodificador uma vez por processo
+
+    Returns:
+        ReverseGeocoder: Geocodificador com os arquivos de data/geo
+    """
+    return ReverseGeocoder(
+        load_places(),
+        load_polygons(MUNICIPALITY_POLYGONS_FILE),
+        load_polygons(STATE_POLYGONS_FILE),
+    )
+
+
+@timed()
+def reverse_geocode(lat: float, lon: float) -> Optional[Tuple[Place, bool]]:
+    """
+    Município do ponto, sem acesso à rede
+
+    Args:
+        lat, lon: Coordenadas
+
+    Returns:
+        Tupla com (lugar, exato), ou None se estiver fora do Brasil
+    """
+    return get_geocoder().lookup(lat, lon)
+
+
+def format_place(result: Optional[Tuple[Place, bool]]) -> Optional[str]:
+    """
+    Descrição curta de um resultado de reverse_geocode, ex.: "Curitiba, PR"
+    ou "perto de Curitiba, PR"
+
+    Args:
+        result: Tupla com (lugar, exato), ou None
+
+    Returns:
+        str, ou None se o ponto estiver fora do Brasil
+    """
+    if result is None:
+        return None
+    place, exact = result
+    return place.label if exact else f"perto de {place.label}"
+
+
+def same_state(
+    first: Optional[Tuple[Place, bool]],
+    second: Optional[Tuple[Place, bool]]
+) -> Optional[bool]:
+    """
+    Se dois resultados de reverse_geocode estão na mesma UF. A UF só é
+    confiável com contornos: sem eles, a sede mais próxima pode ser de
+    outra UF perto das divisas (ex.: Unaí, MG sai "perto de Brasília, DF").
+
+    Args:
+        first, second: Tuplas com (lugar, exato), ou None
+
+    Returns:
+        bool, ou None se não der para saber
+    """
+    if first is None or second is None:
+        return None
+    # Com contornos de estados, a sede mais próxima já é da UF certa
+    reliable = bool(get_geocoder().states.regions)
+    if not (reliable or (first[1] and second[1])):
+        return None
+    return first[0].state == second[0].state
+
+
+def describe_location(lat: float, lon: float) -> Optional[str]:
+    """
+    Descrição curta do lugar do ponto (ver format_place)
+
+    Args:
+        lat, lon: Coordenadas
+
+    Returns:
+        str, ou None se o ponto estiver fora do Brasil
+    """
+    return format_place(reverse_geocode(lat, lon))
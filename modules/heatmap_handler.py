@@ -0,0 +1,295 @@
+import json
+import threading
+from typing import Dict, Hashable, Optional, Tuple
+
+from modules.file_utils import PeriodicFlusher, merge_json_file
+from modules.map_handler import BRAZIL_BOUNDS
+from modules.metrics_handler import timed
+
+HEATMAP_FILE = 'data/heatmaps.json'
+
+# Grade fixa sobre o Brasil: 0.5° ≈ 55 km, no máximo 80 x 80 células por foto
+CELL_SIZE_DEG = 0.5
+GRID_LAT_MIN, _, GRID_LON_MIN, _ = BRAZIL_BOUNDS
+GRID_ROWS = int((BRAZIL_BOUNDS[1] - BRAZIL_BOUNDS[0]) / CELL_SIZE_DEG) + 1
+GRID_COLS = int((BRAZIL_BOUNDS[3] - BRAZIL_BOUNDS[2]) / CELL_SIZE_DEG) + 1
+
+# Histograma de anos limitado ao intervalo do jogo
+MIN_YEAR = 1800
+MAX_YEAR = 2025
+
+# Os chutes novos são somados ao arquivo a cada N segundos
+FLUSH_INTERVAL_SECONDS = 30.0
+
+# O snapshot usado no mapa só é refeito a cada N chutes novos na foto
+SNAPSHOT_EVERY_GUESSES = 10
+# Variantes do snapshot sem o chute do jogador guardadas por foto
+MAX_EXCLUDED_VARIANTS = 64
+
+# Por foto: {'n': chutes, 'o': chutes fora da grade,
+#            'c': {célula: chutes}, 'y': {ano: chutes}}
+# _heatmaps: visão completa (arquivo + chutes deste processo)
+# _delta: só o que este processo ainda não salvou
+_heatmaps: Optional[Dict[int, dict]] = None
+_delta: Dict[int, dict] = {}
+# Por foto: {'v': versão, 'c': {célula: chutes}, 'p': pontos,
+#            'x': {célula descontada: pontos}}
+_snapshots: Dict[int, dict] = {}
+_lock = threading.Lock()
+_flush_lock = threading.Lock()
+
+
+def cell_index(lat: float, lon: float) -> Optional[int]:
+    """
+    Converte coordenadas no índice da célula da grade
+
+    Args:
+        lat, lon: Coordenadas
+
+    Returns:
+        int: Índice da célula, ou None se estiver fora da grade
+    """
+    row = int((lat - GRID_LAT_MIN) // CELL_SIZE_DEG)
+    col = int((lon - GRID_LON_MIN) // CELL_SIZE_DEG)
+    if 0 <= row < GRID_ROWS and 0 <= col < GRID_COLS:
+        return row * GRID_COLS + col
+    return None
+
+
+def cell_center(index: int) -> Tuple[float, float]:
+    """
+    Retorna o centro de uma célula da grade
+
+    Args:
+        index: Índice da célula
+
+    Returns:
+        Tupla com (latitude, longitude)
+    """
+    row, col = divmod(index, GRID_COLS)
+    return (
+        GRID_LAT_MIN + (row + 0.5) * CELL_SIZE_DEG,
+        GRID_LON_MIN + (col + 0.5) * CELL_SIZE_DEG
+    )
+
+
+def _read_heatmaps_file(path: str) -> Dict[int, dict]:
+    """Lê um arquivo de agregados (vazio se não existir)"""
+    heatmaps = {}
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            for photo_id, data in json.load(f).items():
+                heatmaps[int(photo_id)] = {
+                    'n': data.get('n', 0),
+                    'o': data.get('o', 0),
+                    'c': {int(k): v for k, v in data.get('c', {}).items()},
+                    'y': {int(k): v for k, v in data.get('y', {}).items()},
+                }
+    except FileNotFoundError:
+        pass
+    except (json.JSONDecodeError, AttributeError, ValueError) as e:
+        print(f"Erro: Arquivo {path} inválido ({e}), começando do zero")
+    return heatmaps
+
+
+def _merge_into(target: Dict[int, dict], source: Dict[int, dict]) -> None:
+    """Soma os agregados de `source` em `target`"""
+    for photo_id, data in source.items():
+        heatmap = target.setdefault(photo_id,
+                                    {'n': 0, 'o': 0, 'c': {}, 'y': {}})
+        heatmap['n'] += data['n']
+        heatmap['o'] += data['o']
+        for table in ('c', 'y'):
+            for key, count in data[table].items():
+                heatmap[table][key] = heatmap[table].get(key, 0) + count
+
+
+def _load() -> Dict[int, dict]:
+    """Carrega os agregados do arquivo (uma vez por processo)"""
+    global _heatmaps
+
+    if _heatmaps is None:
+        _heatmaps = _read_heatmaps_file(HEATMAP_FILE)
+    return _heatmaps
+
+
+@timed()
+def record_guess(photo_id: int, lat: float, lon: float, year: int) -> None:
+    """
+    Soma um chute ao agregado da foto, em O(1). A memória por foto é
+    limitada pelo tamanho da grade e do intervalo de anos.
+
+    Args:
+        photo_id: ID da foto
+        lat, lon: Coordenadas chutadas
+        year: Ano chutado
+    """
+    index = cell_index(lat, lon)
+    year = _clamp_year(year)
+
+    with _lock:
+        for heatmaps in (_load(), _delta):
+            heatmap = heatmaps.get(photo_id)
+            if heatmap is None:
+                heatmap = heatmaps[photo_id] = \
+                    {'n': 0, 'o': 0, 'c': {}, 'y': {}}
+
+            heatmap['n'] += 1
+            if index is None:
+                heatmap['o'] += 1
+            else:
+                heatmap['c'][index] = heatmap['c'].get(index, 0) + 1
+            heatmap['y'][year] = heatmap['y'].get(year, 0) + 1
+
+    _flusher.start()
+
+
+def _clamp_year(year: int) -> int:
+    return min(MAX_YEAR, max(MIN_YEAR, int(year)))
+
+
+def _points(cells: Dict[int, int]) -> tuple:
+    """Pontos (lat, lon, peso de 0 a 1) das células ocupadas"""
+    if not cells:
+        return ()
+    max_count = max(cells.values())
+    return tuple(
+        (*cell_center(index), round(count / max_count, 3))
+        for index, count in sorted(cells.items())
+    )
+
+
+def get_heat_snapshot(
+    photo_id: int,
+    exclude: Optional[Tuple[float, float]] = None
+) -> Tuple[Hashable, tuple]:
+    """
+    Retorna os pontos do mapa de calor da foto, sem varrer chutes: só as
+    células ocupadas. O snapshot é reaproveitado até a foto receber
+    SNAPSHOT_EVERY_GUESSES chutes novos, o que permite cachear os mapas.
+
+    Args:
+        photo_id: ID da foto
+        exclude: Chute (lat, lon) a descontar da sua célula no snapshot,
+            para mostrar só os chutes dos outros jogadores (aproximado: o
+            snapshot pode ser anterior ao chute)
+
+    Returns:
+        Tupla com (versão, ((lat, lon, peso_de_0_a_1), ...)); a versão muda
+        quando os pontos mudam
+    """
+    with _lock:
+        heatmap = _load().get(photo_id)
+        if not heatmap or not heatmap['c']:
+            return 0, ()
+
+        version = heatmap['n'] // SNAPSHOT_EVERY_GUESSES + 1
+        snapshot = _snapshots.get(photo_id)
+        if snapshot is None or snapshot['v'] != version:
+            snapshot = _snapshots[photo_id] = {
+                'v': version, 'c': dict(heatmap['c']), 'p': None, 'x': {}}
+
+        index = cell_index(*exclude) if exclude is not None else None
+        if index not in snapshot['c']:
+            if snapshot['p'] is None:
+                snapshot['p'] = _points(snapshot['c'])
+            return version, snapshot['p']
+
+        points = snapshot['x'].get(index)
+        if points is None:
+            cells = dict(snapshot['c'])
+            cells[index] -= 1
+            if not cells[index]:
+                del cells[index]
+            points = _points(cells)
+            if len(snapshot['x']) >= MAX_EXCLUDED_VARIANTS:
+                snapshot['x'].clear()
+            snapshot['x'][index] = points
+        return (version, index), points
+
+
+def get_year_histogram(
+    photo_id: int,
+    exclude_year: Optional[int] = None
+) -> Dict[int, int]:
+    """
+    Retorna o histograma de anos chutados na foto
+
+    Args:
+        photo_id: ID da foto
+        exclude_year: Ano chutado a descontar (o do próprio jogador)
+
+    Returns:
+        dict: {ano: chutes}, ordenado por ano
+    """
+    with _lock:
+        heatmap = _load().get(photo_id)
+        histogram = dict(sorted(heatmap['y'].items())) if heatmap else {}
+
+    if exclude_year is not None:
+        year = _clamp_year(exclude_year)
+        if histogram.get(year, 0) > 1:
+            histogram[year] -= 1
+        else:
+            histogram.pop(year, None)
+    return histogram
+
+
+def _to_json(heatmaps: Dict[int, dict]) -> dict:
+    """Formato compacto do arquivo"""
+    return {
+        str(photo_id): {
+            'n': h['n'], 'o': h['o'],
+            'c': {str(k): v for k, v in h['c'].items()},
+            'y': {str(k): v for k, v in h['y'].items()},
+        }
+        for photo_id, h in heatmaps.items()
+    }
+
+
+def flush_heatmaps() -> bool:
+    """
+    Soma ao arquivo os chutes ainda não salvos por este processo. O
+    arquivo é relido e regravado com uma trava entre processos, então
+    instâncias diferentes não apagam os chutes umas das outras.
+
+    Returns:
+        bool: True se salvou com sucesso
+    """
+    global _heatmaps, _delta
+
+    # Um flush por vez no processo (a thread e o atexit)
+    with _flush_lock:
+        with _lock:
+            if not _delta:
+                return True
+            delta, _delta = _delta, {}
+
+        try:
+            merged = merge_json_file(HEATMAP_FILE, delta, _read_heatmaps_file,
+                                     _merge_into, _to_json)
+        except Exception as e:
+            print(f"Erro ao salvar mapas de calor: {e}")
+            with _lock:
+                _merge_into(_delta, delta)
+            return False
+
+        # Passa a ver também os chutes salvos pelas outras instâncias
+        with _lock:
+            _merge_into(merged, _delta)
+            _heatmaps = merged
+        return True
+
+
+def reload_heatmaps() -> None:
+    """Descarta os agregados em memória; serão relidos de HEATMAP_FILE"""
+    global _heatmaps
+
+    with _lock:
+        _heatmaps = None
+        _delta.clear()
+        _snapshots.clear()
+
+
+_flusher = PeriodicFlusher('brasilguessr-heatmaps', flush_heatmaps,
+                           FLUSH_INTERVAL_SECONDS)
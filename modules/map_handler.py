@@ -1,7 +1,17 @@
-from typing import Optional, Tuple
+from __future__ import annotations
 
-import folium
-from streamlit_folium import st_folium
+import math
+import threading
+from collections import OrderedDict
+from functools import lru_cache
+from typing import TYPE_CHECKING, Hashable, List, Optional, Sequence, Tuple
+
+from modules.metrics_handler import timed
+from modules.startup_handler import lazy_import
+
+# folium e streamlit_folium são pesados: só são importados no primeiro uso
+if TYPE_CHECKING:
+    import folium
 
 # Constantes
 BRAZIL_CENTER_LAT = -14.235
@@ -11,7 +21,39 @@ RESULT_MAP_ZOOM = 5
 MAP_WIDTH = 500
 MAP_HEIGHT = 300
 
+# Mapa estático do resultado (SVG), cacheado em memória por chute
+# quantizado. Sem cache em disco: chutes raramente caem na mesma célula e
+# desenhar o SVG (~0,2 ms) custa menos que ler ou gravar um arquivo.
+STATIC_MAP_CACHE_SIZE = 1024
+HEAT_LAYER_CACHE_SIZE = 256
+GUESS_QUANTIZATION_DEG = 0.01  # ~1 km de latitude
+STATIC_MAP_PADDING_DEG = 2.0
+HEAT_LAYER_PLACEHOLDER = '<!--heat-->'
+HEAT_RADIUS_DEG = 0.4
+HEAT_MAX_OPACITY = 0.6
+
+# Limites do Brasil (lat_min, lat_max, lon_min, lon_max)
+BRAZIL_BOUNDS = (-33.8, 5.3, -74.0, -34.8)
+
+# Contorno bem simplificado do Brasil (lat, lon), só para o mapa estático
+BRAZIL_OUTLINE = [
+    (5.27, -60.2), (4.5, -59.6), (2.0, -56.5), (2.3, -54.5), (4.4, -51.6),
+    (1.8, -50.0), (-0.2, -48.5), (-0.8, -47.0), (-1.2, -44.9), (-2.5, -44.0),
+    (-2.9, -41.0), (-3.7, -38.5), (-5.2, -35.3), (-7.1, -34.8),
+    (-8.0, -34.9), (-10.5, -36.3), (-13.0, -38.5), (-15.0, -39.0),
+    (-18.0, -39.6), (-20.3, -40.3), (-22.0, -41.0), (-23.0, -42.0),
+    (-23.0, -43.2), (-24.0, -46.3), (-25.5, -48.5), (-28.5, -48.8),
+    (-30.0, -50.2), (-32.2, -52.1), (-33.75, -53.4), (-32.5, -53.2),
+    (-30.2, -57.6), (-27.5, -55.7), (-25.6, -54.6), (-24.0, -54.3),
+    (-22.5, -55.7), (-22.0, -58.0), (-19.8, -58.1), (-16.3, -58.4),
+    (-15.3, -60.2), (-13.5, -61.8), (-11.9, -65.0), (-10.8, -65.3),
+    (-9.7, -66.9), (-11.0, -69.6), (-9.5, -72.7), (-7.5, -73.9),
+    (-4.2, -69.9), (-1.3, -69.5), (1.1, -69.8), (1.2, -66.9), (2.2, -64.0),
+    (4.0, -64.7), (4.5, -61.0),
+]
+
 
+@timed()
 def create_brazil_map(
     center_lat: float = BRAZIL_CENTER_LAT,
     center_lon: float = BRAZIL_CENTER_LON,
@@ -28,6 +70,7 @@ def create_brazil_map(
     Returns:
         folium.Map: Mapa criado
     """
+    folium = lazy_import('folium')
     return folium.Map(
         location=[center_lat, center_lon],
         zoom_start=zoom,
@@ -35,6 +78,7 @@ def create_brazil_map(
     )
 
 
+@timed()
 def display_interactive_map(
     m: folium.Map,
     key: str = "map",
@@ -54,6 +98,7 @@ def display_interactive_map(
         dict: Dados do mapa incluindo último clique, ou None se não houver dados
     """
     try:
+        st_folium = lazy_import('streamlit_folium').st_folium
         map_data = st_folium(
             m,
             width=width,
@@ -67,6 +112,7 @@ def display_interactive_map(
         return None
 
 
+@timed()
 def add_marker_to_map(
     m: folium.Map,
     lat: float,
@@ -86,6 +132,7 @@ def add_marker_to_map(
         color: Cor do marcador
         icon: Ícone do marcador
     """
+    folium = lazy_import('folium')
     folium.Marker(
         location=[lat, lon],
         popup=popup_text,
@@ -93,6 +140,7 @@ def add_marker_to_map(
     ).add_to(m)
 
 
+@timed()
 def add_line_between_points(
     m: folium.Map,
     point1: Tuple[float, float],
@@ -112,6 +160,7 @@ def add_line_between_points(
         weight: Espessura da linha
         opacity: Opacidade da linha
     """
+    folium = lazy_import('folium')
     folium.PolyLine(
         locations=[point1, point2],
         color=color,
@@ -141,12 +190,14 @@ def calculate_map_center(
     return center_lat, center_lon
 
 
+@timed()
 def create_result_map(
     guess_lat: float,
     guess_lon: float,
     correct_lat: float,
     correct_lon: float,
-    zoom: int = RESULT_MAP_ZOOM
+    zoom: int = RESULT_MAP_ZOOM,
+    heat_points: Sequence[Tuple[float, float, float]] = ()
 ) -> folium.Map:
     """
     Cria um mapa mostrando o chute do jogador e o local correto
@@ -155,6 +206,7 @@ def create_result_map(
         guess_lat, guess_lon: Coordenadas do chute
         correct_lat, correct_lon: Coordenadas corretas
         zoom: Nível de zoom do mapa (para melhorar a visualização)
+        heat_points: Pontos (lat, lon, peso) do mapa de calor dos chutes
 
     Returns:
         folium.Map: Mapa com ambos os marcadores e uma linha conectando-os
@@ -165,8 +217,14 @@ def create_result_map(
     )
 
     # Mapa centralizado
+    folium = lazy_import('folium')
     m = folium.Map(location=[center_lat, center_lon], zoom_start=zoom)
 
+    # Onde os outros jogadores chutaram
+    if heat_points:
+        plugins = lazy_import('folium.plugins')
+        plugins.HeatMap([list(p) for p in heat_points]).add_to(m)
+
     # Marcador do chute (azul)
     add_marker_to_map(
         m, guess_lat, guess_lon,
@@ -187,3 +245,213 @@ def create_result_map(
     )
 
     return m
+
+
+def warm_up_maps() -> None:
+    """Importa o folium e renderiza um mapa base para aquecer os templates"""
+    lazy_import('streamlit_folium')
+    create_brazil_map().get_root().render()
+
+
+def quantize_coords(lat: float, lon: float) -> Tuple[int, int]:
+    """
+    Quantiza coordenadas numa grade de ~1 km (chave do cache do mapa estático)
+
+    Args:
+        lat, lon: Coordenadas a quantizar
+
+    Returns:
+        Tupla com os índices (lat, lon) na grade
+    """
+    return (
+        round(lat / GUESS_QUANTIZATION_DEG),
+        round(lon / GUESS_QUANTIZATION_DEG)
+    )
+
+
+def _static_map_bounds(
+    points: List[Tuple[float, float]]
+) -> Tuple[float, float, float, float]:
+    """Calcula os limites do mapa estático (Brasil + pontos fora dele)"""
+    lat_min, lat_max, lon_min, lon_max = BRAZIL_BOUNDS
+    for lat, lon in points:
+        lat_min, lat_max = min(lat_min, lat), max(lat_max, lat)
+        lon_min, lon_max = min(lon_min, lon), max(lon_max, lon)
+
+    pad = STATIC_MAP_PADDING_DEG
+    return lat_min - pad, lat_max + pad, lon_min - pad, lon_max + pad
+
+
+@timed()
+def render_result_map_svg(
+    guess_lat: float,
+    guess_lon: float,
+    correct_lat: float,
+    correct_lon: float,
+    width: int = MAP_WIDTH
+) -> str:
+    """
+    Desenha um mapa estático (SVG) com o chute, o local correto e a linha
+    entre eles, sobre um contorno simplificado do Brasil. A camada do mapa
+    de calor entra depois, no lugar de HEAT_LAYER_PLACEHOLDER.
+
+    Args:
+        guess_lat, guess_lon: Coordenadas do chute
+        correct_lat, correct_lon: Coordenadas corretas
+        width: Largura da imagem em pixels
+
+    Returns:
+        str: Documento SVG
+    """
+    lat_min, lat_max, lon_min, lon_max = _static_map_bounds(
+        [(guess_lat, guess_lon), (correct_lat, correct_lon)]
+    )
+
+    # Projeção equiretangular simples, corrigida pela latitude média
+    x_scale = math.cos(math.radians((lat_min + lat_max) / 2))
+    span_x = (lon_max - lon_min) * x_scale
+    span_y = lat_max - lat_min
+    pixels_per_deg = width / span_x
+    height = round(span_y * pixels_per_deg)
+
+    def project(lat: float, lon: float) -> Tuple[float, float]:
+        x = (lon - lon_min) * x_scale * pixels_per_deg
+        y = (lat_max - lat) * pixels_per_deg
+        return round(x, 1), round(y, 1)
+
+    outline = " ".join(
+        f"{x},{y}" for x, y in (project(lat, lon) for lat, lon in BRAZIL_OUTLINE)
+    )
+    gx, gy = project(guess_lat, guess_lon)
+    cx, cy = project(correct_lat, correct_lon)
+
+    # A camada de calor é desenhada em graus (x = lon, y = -lat); esta
+    # transformação a leva para a mesma projeção do resto do mapa
+    sx = x_scale * pixels_per_deg
+    heat_transform = (
+        f"matrix({sx:.4f} 0 0 {pixels_per_deg:.4f} "
+        f"{-lon_min * sx:.2f} {lat_max * pixels_per_deg:.2f})"
+    )
+
+    return (
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" '
+        f'height="{height}" viewBox="0 0 {width} {height}">'
+        f'<rect width="100%" height="100%" fill="#aad3df"/>'
+        f'<polygon points="{outline}" fill="#f2efe9" stroke="#9e9e9e" '
+        f'stroke-width="1"/>'
+        f'<g transform="{heat_transform}">{HEAT_LAYER_PLACEHOLDER}</g>'
+        f'<line x1="{gx}" y1="{gy}" x2="{cx}" y2="{cy}" stroke="red" '
+        f'stroke-width="2" stroke-opacity="0.8"/>'
+        f'<circle cx="{gx}" cy="{gy}" r="6" fill="#38aadd" stroke="white" '
+        f'stroke-width="2"><title>Seu chute</title></circle>'
+        f'<circle cx="{cx}" cy="{cy}" r="6" fill="#72b026" stroke="white" '
+        f'stroke-width="2"><title>Local correto</title></circle>'
+        f'</svg>'
+    )
+
+
+def render_heat_layer(heat_points: Sequence[Tuple[float, float, float]]) -> str:
+    """
+    Desenha a camada SVG do mapa de calor, em coordenadas de graus
+
+    Args:
+        heat_points: Pontos (lat, lon, peso de 0 a 1)
+
+    Returns:
+        str: Elementos SVG da camada
+    """
+    return "".join(
+        f'<circle cx="{lon:.2f}" cy="{-lat:.2f}" r="{HEAT_RADIUS_DEG}" '
+        f'fill="#ff7800" fill-opacity="{weight * HEAT_MAX_OPACITY:.2f}"/>'
+        for lat, lon, weight in heat_points
+    )
+
+
+# Camadas de calor desenhadas (LRU): {(id, versão): svg}
+_heat_layers: 'OrderedDict[Tuple[int, Hashable], str]' = OrderedDict()
+# As sessões do Streamlit rodam em threads diferentes
+_heat_layers_lock = threading.Lock()
+
+
+def _get_heat_layer(
+    photo_id: int,
+    heat_version: Hashable,
+    heat_points: Sequence[Tuple[float, float, float]]
+) -> str:
+    """Reaproveita a camada de calor enquanto a versão não mudar"""
+    key = (photo_id, heat_version)
+    with _heat_layers_lock:
+        layer = _heat_layers.get(key)
+        if layer is not None:
+            _heat_layers.move_to_end(key)
+            return layer
+
+    # Desenha fora da trava; se duas sessões desenharem a mesma camada,
+    # vale a última
+    layer = render_heat_layer(heat_points)
+    with _heat_layers_lock:
+        _heat_layers[key] = layer
+        _heat_layers.move_to_end(key)
+        while len(_heat_layers) > HEAT_LAYER_CACHE_SIZE:
+            _heat_layers.popitem(last=False)
+    return layer
+
+
+@lru_cache(maxsize=STATIC_MAP_CACHE_SIZE)
+def _cached_result_map_svg(
+    photo_id: int,
+    guess_key: Tuple[int, int],
+    correct_lat: float,
+    correct_lon: float
+) -> str:
+    """
+    Desenha o SVG de um chute quantizado. A resposta faz parte da chave:
+    uma foto movida no catálogo não reaproveita o mapa antigo.
+    """
+    return render_result_map_svg(
+        guess_key[0] * GUESS_QUANTIZATION_DEG,
+        guess_key[1] * GUESS_QUANTIZATION_DEG,
+        correct_lat,
+        correct_lon
+    )
+
+
+@timed()
+def get_static_result_map(
+    photo_id: int,
+    guess_lat: float,
+    guess_lon: float,
+    correct_lat: float,
+    correct_lon: float,
+    heat_points: Sequence[Tuple[float, float, float]] = (),
+    heat_version: Hashable = 0
+) -> str:
+    """
+    Retorna o mapa estático do resultado, cacheado em memória (LRU) por
+    (foto, chute quantizado em ~1 km, resposta). O mapa de calor é
+    uma camada à parte, cacheada por versão.
+
+    Args:
+        photo_id: ID da foto
+        guess_lat, guess_lon: Coordenadas do chute
+        correct_lat, correct_lon: Coordenadas corretas
+        heat_points: Pontos (lat, lon, peso) do mapa de calor dos chutes
+        heat_version: Versão dos pontos (muda quando eles mudam)
+
+    Returns:
+        str: Documento SVG
+    """
+    svg = _cached_result_map_svg(
+        photo_id,
+        quantize_coords(guess_lat, guess_lon),
+        correct_lat,
+        correct_lon
+    )
+
+    if not heat_points:
+        return svg
+    return svg.replace(
+        HEAT_LAYER_PLACEHOLDER,
+        _get_heat_layer(photo_id, heat_version, heat_points),
+        1
+    )
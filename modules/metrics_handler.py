@@ -0,0 +1,302 @@
+import os
+import tempfile
+import threading
+import time
+from collections import deque
+from contextlib import nullcontext
+from functools import wraps
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Callable, Deque, Dict, Optional
+
+
+def _env_port(name: str, default: int = 0) -> int:
+    """Porta de uma variável de ambiente (o padrão se for inválida)"""
+    value = os.environ.get(name, '')
+    if not value:
+        return default
+    try:
+        port = int(value)
+    except ValueError:
+        port = -1
+    if not 0 <= port <= 65535:
+        print(f"Aviso: {name}={value!r} não é uma porta válida, "
+              f"usando {default}")
+        return default
+    return port
+
+
+# Configuração via variáveis de ambiente (desligado por padrão)
+METRICS_ENABLED = os.environ.get('BRASILGUESSR_METRICS') == '1'
+METRICS_FILE = os.environ.get('BRASILGUESSR_METRICS_FILE', 'data/metrics.prom')
+METRICS_PORT = _env_port('BRASILGUESSR_METRICS_PORT')
+EXPORT_INTERVAL_SECONDS = 10.0
+MAX_SAMPLES_PER_SPAN = 2048  # janela usada no cálculo dos percentis
+QUANTILES = (0.5, 0.95, 0.99)
+METRIC_NAME = 'brasilguessr_span_seconds'
+
+
+class _SpanStats:
+    """Acumula as durações de um span"""
+
+    def __init__(self):
+        self.count = 0
+        self.total = 0.0
+        self.samples: Deque[float] = deque(maxlen=MAX_SAMPLES_PER_SPAN)
+
+    def add(self, seconds: float) -> None:
+        self.count += 1
+        self.total += seconds
+        self.samples.append(seconds)
+
+
+_spans: Dict[str, _SpanStats] = {}
+_lock = threading.Lock()
+_last_export = 0.0
+_server: Optional[ThreadingHTTPServer] = None
+
+
+def record(name: str, seconds: float) -> None:
+    """
+    Registra uma duração para o span
+
+    Args:
+        name: Nome do span
+        seconds: Duração em segundos
+    """
+    with _lock:
+        stats = _spans.get(name)
+        if stats is None:
+            stats = _spans[name] = _SpanStats()
+        stats.add(seconds)
+
+
+class _Span:
+    """Context manager que mede o tempo de um bloco"""
+
+    def __init__(self, name: str):
+        self.name = name
+        self.start = 0.0
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, time.perf_counter() - self.start)
+        return False
+
+
+_NULL_SPAN = nullcontext()
+
+
+def span(name: str):
+    """
+    Mede o tempo de um bloco `with`. Desligado, não mede nada
+
+    Args:
+        name: Nome do span
+    """
+    if not METRICS_ENABLED:
+        return _NULL_SPAN
+    return _Span(name)
+
+
+def timed(name: Optional[str] = None) -> Callable:
+    """
+    Decorador que mede o tempo de cada chamada da função. Com as métricas
+    desligadas devolve a própria função, sem custo nenhum
+
+    Args:
+        name: Nome do span (padrão: <módulo>.<função>)
+    """
+    def decorator(func: Callable) -> Callable:
+        if not METRICS_ENABLED:
+            return func
+
+        span_name = name or f"{func.__module__.split('.')[-1]}.{func.__name__}"
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                record(span_name, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def _quantile(sorted_samples: list, q: float) -> float:
+    """Percentil pelo método do posto mais próximo"""
+    if not sorted_samples:
+        return 0.0
+    index = min(len(sorted_samples) - 1, int(q * len(sorted_samples)))
+    return sorted_samples[index]
+
+
+def get_summary() -> Dict[str, dict]:
+    """
+    Retorna um resumo de todos os spans
+
+    Returns:
+        dict: {span: {'count', 'sum', 'p50', 'p95', 'p99'}}
+    """
+    with _lock:
+        snapshot = {
+            name: (stats.count, stats.total, sorted(stats.samples))
+            for name, stats in _spans.items()
+        }
+
+    summary = {}
+    for name, (count, total, samples) in snapshot.items():
+        summary[name] = {'count': count, 'sum': total}
+        for q in QUANTILES:
+            summary[name][f"p{int(q * 100)}"] = _quantile(samples, q)
+    return summary
+
+
+def render_prometheus() -> str:
+    """
+    Gera as métricas no formato texto do Prometheus (summary por span)
+
+    Returns:
+        str: Métricas em formato de exposição do Prometheus
+    """
+    lines = [
+        f"# HELP {METRIC_NAME} Duração dos trechos críticos de um rerun.",
+        f"# TYPE {METRIC_NAME} summary",
+    ]
+
+    for name, stats in sorted(get_summary().items()):
+        for q in QUANTILES:
+            lines.append(
+                f'{METRIC_NAME}{{span="{name}",quantile="{q}"}} '
+                f'{stats[f"p{int(q * 100)}"]:.6f}'
+            )
+        lines.append(f'{METRIC_NAME}_sum{{span="{name}"}} {stats["sum"]:.6f}')
+        lines.append(f'{METRIC_NAME}_count{{span="{name}"}} {stats["count"]}')
+
+    return "\n".join(lines) + "\n"
+
+
+def export_prometheus(path: str = METRICS_FILE) -> bool:
+    """
+    Salva as métricas num arquivo texto do Prometheus (ex.: para o
+    textfile collector do node_exporter)
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        bool: True se salvou com sucesso
+    """
+    tmp_path = None
+    try:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        # Arquivo temporário único: várias threads podem exportar ao mesmo
+        # tempo, e cada uma troca o arquivo final de uma vez
+        with tempfile.NamedTemporaryFile(
+                'w', encoding='utf-8', dir=directory or '.',
+                prefix=f".{os.path.basename(path)}.", suffix='.tmp',
+                delete=False) as f:
+            tmp_path = f.name
+            f.write(render_prometheus())
+        # NamedTemporaryFile cria com 0600; o coletor precisa ler
+        os.chmod(tmp_path, 0o644)
+        os.replace(tmp_path, path)
+        return True
+    except Exception as e:
+        print(f"Erro ao exportar métricas: {e}")
+        if tmp_path and os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        return False
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    """Serve as métricas em /metrics"""
+
+    def do_GET(self):
+        if self.path != '/metrics':
+            self.send_error(404)
+            return
+
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # sem log a cada scrape
+
+
+def start_metrics_server(port: int = METRICS_PORT) -> bool:
+    """
+    Sobe (uma vez por processo) um servidor HTTP local com /metrics
+
+    Args:
+        port: Porta do servidor
+
+    Returns:
+        bool: True se o servidor está rodando
+    """
+    global _server
+
+    with _lock:
+        if _server is not None:
+            return True
+        try:
+            _server = ThreadingHTTPServer(('127.0.0.1', port), _MetricsRequestHandler)
+        except OSError as e:
+            print(f"Erro ao iniciar servidor de métricas: {e}")
+            return False
+
+    threading.Thread(target=_server.serve_forever, daemon=True).start()
+    return True
+
+
+def maybe_export() -> None:
+    """
+    Publica as métricas ao fim de um rerun: sobe o servidor local (se houver
+    porta configurada) ou grava o arquivo, no máximo a cada
+    EXPORT_INTERVAL_SECONDS
+    """
+    global _last_export
+
+    if not METRICS_ENABLED:
+        return
+
+    if METRICS_PORT:
+        start_metrics_server()
+        return
+
+    now = time.monotonic()
+    if now - _last_export >= EXPORT_INTERVAL_SECONDS:
+        _last_export = now
+        export_prometheus()
+
+
+def export_after_run(func: Callable) -> Callable:
+    """
+    Decorador para o main e os fragmentos do app: chama maybe_export ao fim
+    de cada execução, mesmo quando ela termina com st.rerun(), st.stop() ou
+    um return antecipado. Com as métricas desligadas devolve a própria
+    função.
+    """
+    if not METRICS_ENABLED:
+        return func
+
+    @wraps(func)
+    def wrapper(*args, **kwargs):
+        try:
+            return func(*args, **kwargs)
+        finally:
+            maybe_export()
+
+    return wrapper
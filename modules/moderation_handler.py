@@ -0,0 +1,276 @@
+from functools import lru_cache
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from modules.metrics_handler import timed
+from modules.text_utils import normalize_for_moderation
+
+BLOCKLIST_FILE = 'data/blocklist.txt'
+
+
+class AhoCorasick:
+    """
+    Autômato de Aho-Corasick: encontra todos os termos de uma lista num
+    texto em tempo linear no tamanho do texto, independente de quantos
+    termos existem
+
+    Attributes:
+        size (int): Quantidade de estados do autômato
+    """
+
+    def __init__(self, terms: Iterable[str]):
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        # Tamanho do termo que termina no estado (0 se nenhum) e o próximo
+        # estado na cadeia de falhas que também termina um termo
+        self._term_length: List[int] = [0]
+        self._output_link: List[int] = [0]
+
+        for term in terms:
+            self._add(term)
+        self._build_links()
+
+    @property
+    def size(self) -> int:
+        return len(self._goto)
+
+    def _add(self, term: str) -> None:
+        """Insere um termo na trie"""
+        if not term:
+            return
+        state = 0
+        for char in term:
+            next_state = self._goto[state].get(char)
+            if next_state is None:
+                next_state = len(self._goto)
+                self._goto[state][char] = next_state
+                self._goto.append({})
+                self._fail.append(0)
+                self._term_length.append(0)
+                self._output_link.append(0)
+            state = next_state
+        self._term_length[state] = len(term)
+
+    def _build_links(self) -> None:
+        """Calcula as falhas em largura (BFS) a partir da raiz"""
+        queue = list(self._goto[0].values())
+        for state in queue:
+            for char, child in self._goto[state].items():
+                queue.append(child)
+
+                fail = self._fail[state]
+                while fail and char not in self._goto[fail]:
+                    fail = self._fail[fail]
+                fail = self._goto[fail].get(char, 0)
+
+                self._fail[child] = fail
+                self._output_link[child] = (
+                    fail if self._term_length[fail] else self._output_link[fail])
+
+    def iter_matches(self, text: str) -> Iterable[Tuple[int, int]]:
+        """
+        Percorre o texto uma vez, gerando os termos encontrados
+
+        Args:
+            text: Texto (já normalizado)
+
+        Yields:
+            Tupla com (início, fim) de cada ocorrência em text
+        """
+        goto, fail = self._goto, self._fail
+        term_length, output_link = self._term_length, self._output_link
+
+        state = 0
+        for end, char in enumerate(text, 1):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+
+            match = state if term_length[state] else output_link[state]
+            while match:
+                yield end - term_length[match], end
+                match = output_link[match]
+
+
+# Marcador de curinga na lista: "termo*" bloqueia também palavras que
+# começam com o termo, "*termo" as que terminam com ele e "*termo*" o termo
+# em qualquer lugar. Sem curinga, só a palavra inteira.
+WILDCARD = '*'
+
+# Por termo: (pode ter letras antes, pode ter letras depois)
+TermModes = Dict[str, Tuple[bool, bool]]
+
+# Nomes que o filtro precisa aceitar (palavras e nomes comuns que contêm
+# um termo da lista) e recusar; conferidos por self_check()
+ALLOWED_EXAMPLES = (
+    'Dickson', 'Dicksonia', 'Therapist', 'Penistone', 'Cunha', 'Scunthorpe',
+    'Cumberbatch', 'Hitchcock', 'Yoshitaka', 'Assis', 'Rafael Rolando',
+    'Pauline', 'Picasso', 'Porrada Total', 'Grace Puttock', 'Shitake',
+)
+BLOCKED_EXAMPLES = (
+    'dick', 'Dicks', 'rapist', 'p0rr4', 'merdaaa', 'p.u.t.a',
+    'vai tomar no cu', 'FuckYou', 'xXcaralhoXx', 'arrombados', 'Fdp123 fdp',
+)
+
+
+def parse_blocklist_line(line: str) -> Optional[Tuple[str, bool, bool]]:
+    """
+    Interpreta uma linha da lista de bloqueio
+
+    Args:
+        line: Linha do arquivo (com curingas opcionais nas pontas)
+
+    Returns:
+        Tupla com (termo normalizado, pode ter letras antes, pode ter
+        letras depois), ou None se a linha for vazia ou comentário
+    """
+    line = line.split('#', 1)[0].strip()
+    open_start = line.startswith(WILDCARD)
+    open_end = line.endswith(WILDCARD)
+    term = normalize_for_moderation(line.strip(WILDCARD))
+    if not term:
+        return None
+    return term, open_start, open_end
+
+
+def _read_blocklist(path: str) -> TermModes:
+    """Lê a lista: {termo normalizado: (letras antes, letras depois)}"""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            lines = f.readlines()
+    except FileNotFoundError:
+        print(f"Aviso: {path} não encontrado, nomes não serão filtrados")
+        return {}
+
+    modes: TermModes = {}
+    for line in lines:
+        parsed = parse_blocklist_line(line)
+        if parsed is None:
+            continue
+        term, open_start, open_end = parsed
+        # O mesmo termo escrito de formas diferentes: vale a mais ampla
+        previous = modes.get(term, (False, False))
+        modes[term] = (previous[0] or open_start, previous[1] or open_end)
+    return modes
+
+
+def load_blocklist(path: str = BLOCKLIST_FILE) -> List[str]:
+    """
+    Lê a lista de termos bloqueados (um por linha, '#' para comentários)
+
+    Args:
+        path: Caminho do arquivo
+
+    Returns:
+        List[str]: Termos já normalizados, sem repetição e sem curingas
+    """
+    return sorted(get_term_modes(path))
+
+
+@lru_cache(maxsize=4)
+def get_term_modes(path: str = BLOCKLIST_FILE) -> TermModes:
+    """
+    Curingas de cada termo da lista (ver WILDCARD), lidos uma vez por
+    processo
+
+    Args:
+        path: Caminho do arquivo da lista
+
+    Returns:
+        dict: {termo: (pode ter letras antes, pode ter letras depois)}
+    """
+    return _read_blocklist(path)
+
+
+@timed()
+@lru_cache(maxsize=4)
+def get_automaton(path: str = BLOCKLIST_FILE) -> AhoCorasick:
+    """
+    Monta o autômato da lista de termos uma vez por processo
+
+    Args:
+        path: Caminho do arquivo da lista
+
+    Returns:
+        AhoCorasick: Autômato pronto para buscas
+    """
+    return AhoCorasick(load_blocklist(path))
+
+
+def _matches_boundaries(text: str, start: int, end: int,
+                        open_start: bool, open_end: bool) -> bool:
+    """
+    Se text[start:end] respeita as bordas de palavra exigidas: sem letras
+    grudadas antes (a não ser com open_start) e depois (com open_end)
+    """
+    return ((open_start or start == 0 or not text[start - 1].isalnum()) and
+            (open_end or end == len(text) or not text[end].isalnum()))
+
+
+@timed()
+def find_blocked_term(
+    name: str,
+    automaton: Optional[AhoCorasick] = None,
+    modes: Optional[TermModes] = None
+) -> Optional[str]:
+    """
+    Procura um termo bloqueado no nome, em tempo linear no tamanho do nome.
+    Cada termo só vale como palavra inteira, a não ser que a lista marque
+    o contrário com curingas ("termo*", "*termo", "*termo*"), então
+    "Dickson" não é bloqueado por "dicks".
+
+    Args:
+        name: Nome do jogador
+        automaton: Autômato a usar (padrão: o da lista BLOCKLIST_FILE)
+        modes: Curingas por termo (padrão: os da lista BLOCKLIST_FILE se o
+            autômato também for o padrão; senão, só palavras inteiras)
+
+    Returns:
+        str: Primeiro termo encontrado (normalizado), ou None
+    """
+    if automaton is None:
+        automaton = get_automaton()
+        if modes is None:
+            modes = get_term_modes()
+    modes = modes or {}
+    text = normalize_for_moderation(name)
+
+    for start, end in automaton.iter_matches(text):
+        term = text[start:end]
+        open_start, open_end = modes.get(term, (False, False))
+        if _matches_boundaries(text, start, end, open_start, open_end):
+            return term
+    return None
+
+
+def is_name_allowed(name: str) -> bool:
+    """
+    Verifica se o nome pode entrar no ranking
+
+    Args:
+        name: Nome do jogador
+
+    Returns:
+        bool: True se nenhum termo bloqueado foi encontrado
+    """
+    return find_blocked_term(name) is None
+
+
+def self_check() -> List[str]:
+    """
+    Confere o filtro contra ALLOWED_EXAMPLES e BLOCKED_EXAMPLES (rodado
+    no grupo de moderação dos benchmarks)
+
+    Returns:
+        List[str]: Descrição de cada exemplo com resultado errado (vazia se
+        tudo certo)
+    """
+    errors = []
+    for name in ALLOWED_EXAMPLES:
+        term = find_blocked_term(name)
+        if term is not None:
+            errors.append(f"{name!r} foi bloqueado por {term!r}")
+    for name in BLOCKED_EXAMPLES:
+        if is_name_allowed(name):
+            errors.append(f"{name!r} não foi bloqueado")
+    return errors
+
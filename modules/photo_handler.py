@@ -0,0 +1,54 @@
+import json
+import os
+from functools import lru_cache
+from typing import Tuple
+
+from classes.photo import Photo
+from modules.metrics_handler import timed
+
+PHOTOS_FILE = 'data/photos.json'
+
+
+def catalog_version(path: str = PHOTOS_FILE) -> Tuple[int, int]:
+    """
+    Versão do arquivo de fotos: (mtime em ns, tamanho). Muda quando o
+    arquivo é editado.
+
+    Args:
+        path: Caminho do arquivo JSON de fotos
+
+    Returns:
+        Tuple[int, int]: (mtime_ns, tamanho em bytes)
+
+    Raises:
+        FileNotFoundError: se o arquivo não existir
+    """
+    stat = os.stat(path)
+    return stat.st_mtime_ns, stat.st_size
+
+
+@lru_cache(maxsize=4)
+def _load_catalog(path: str, version: Tuple[int, int]) -> Tuple[Photo, ...]:
+    """Lê o catálogo; `version` só faz parte da chave do cache"""
+    with open(path, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+        return tuple(Photo.from_dict(p) for p in data)
+
+
+@timed()
+def load_photo_catalog(path: str = PHOTOS_FILE) -> Tuple[Photo, ...]:
+    """
+    Carrega o catálogo de fotos uma vez por versão do arquivo e o
+    compartilha entre as sessões (por isso é uma tupla, que não pode ser
+    alterada). Editar o arquivo faz a próxima chamada reler o catálogo.
+
+    Args:
+        path: Caminho do arquivo JSON de fotos
+
+    Returns:
+        Tuple[Photo, ...]: Fotos do catálogo
+
+    Raises:
+        FileNotFoundError, json.JSONDecodeError: se o arquivo for inválido
+    """
+    return _load_catalog(path, catalog_version(path))
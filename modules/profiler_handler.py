@@ -0,0 +1,367 @@
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from functools import wraps
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+import streamlit as st
+from streamlit.runtime.scriptrunner import get_script_run_ctx
+
+from classes.session_profile import SessionProfile
+from classes.session_store import SessionStore
+from modules import rerun_handler
+
+# Perfil de memória e de reruns por sessão (desligado por padrão;
+# BRASILGUESSR_SESSION_PROFILE=1 liga)
+PROFILER_ENABLED = os.environ.get('BRASILGUESSR_SESSION_PROFILE') == '1'
+
+# Memória disponível para o processo, usada na estimativa de capacidade
+MEMORY_BUDGET_MB = float(os.environ.get('BRASILGUESSR_MEMORY_BUDGET_MB',
+                                        '1024'))
+
+APP_RUN = 'app'
+
+# O session_state é medido no primeiro rerun e depois a cada N
+SAMPLE_EVERY_RUNS = 10
+TOP_KEYS = 5
+# Limite de objetos visitados por medição (mantém o custo limitado)
+MAX_SIZEOF_OBJECTS = 10_000
+
+SWEEP_INTERVAL_SECONDS = 60.0
+# Perfis de sessões sem rerun há mais que isso são esquecidos (a sessão
+# provavelmente foi fechada)
+FORGET_AFTER_SECONDS = 6 * 3600
+
+_profiles: Dict[str, SessionProfile] = {}
+_lock = threading.Lock()
+_last_sweep = 0.0
+_baseline_rss: Optional[int] = None
+
+
+def profiled(kind: str = APP_RUN) -> Callable:
+    """
+    Decorador que mede cada rerun da sessão: o main do app (kind='app') ou
+    um fragmento (kind=nome do fragmento, o mesmo usado em
+    rerun_handler.record_fragment_run). Um fragmento executado dentro de um
+    rerun completo não é contado de novo; quem decide é o rerun_handler.
+
+    Args:
+        kind: 'app' ou nome do fragmento
+    """
+    def decorator(func: Callable) -> Callable:
+        if not PROFILER_ENABLED:
+            return func
+
+        fragment = kind != APP_RUN
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            ctx = get_script_run_ctx(suppress_warning=True)
+            if ctx is None:
+                return func(*args, **kwargs)  # fora do Streamlit
+            if fragment and not rerun_handler.is_fragment_rerun(kind):
+                return func(*args, **kwargs)  # já medido pelo rerun do app
+
+            start = time.perf_counter()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                _finish_run(ctx, fragment, time.perf_counter() - start)
+
+        return wrapper
+
+    return decorator
+
+
+def _finish_run(ctx: Any, fragment: bool, seconds: float) -> None:
+    """Soma o rerun ao perfil da sessão e, às vezes, mede o session_state"""
+    with _lock:
+        profile = _profiles.get(ctx.session_id)
+        if profile is None:
+            _capture_baseline()
+            profile = _profiles[ctx.session_id] = \
+                SessionProfile(ctx.session_id)
+        profile.record_run(seconds, fragment)
+        sample = profile.runs % SAMPLE_EVERY_RUNS == 1
+
+    if sample:
+        _sample(profile, ctx.session_state.filtered_state)
+    _maybe_sweep()
+
+
+def deep_sizeof(obj: Any, seen: Optional[set] = None) -> int:
+    """
+    Tamanho aproximado de um objeto e do que ele contém (sys.getsizeof
+    somado pelos contêineres e atributos), contando cada objeto uma vez
+
+    Args:
+        obj: Objeto a medir
+        seen: IDs já contados (compartilhe entre chamadas para não contar
+            objetos em comum duas vezes)
+
+    Returns:
+        int: Bytes
+    """
+    seen = set() if seen is None else seen
+    total = 0
+    stack = [obj]
+    while stack and len(seen) < MAX_SIZEOF_OBJECTS:
+        current = stack.pop()
+        if id(current) in seen:
+            continue
+        seen.add(id(current))
+        total += sys.getsizeof(current, 0)
+
+        if isinstance(current, (str, bytes, bytearray, int, float, bool)):
+            continue
+        if isinstance(current, dict):
+            stack.extend(current.keys())
+            stack.extend(current.values())
+        elif isinstance(current, (list, tuple, set, frozenset)):
+            stack.extend(current)
+        else:
+            attributes = getattr(current, '__dict__', None)
+            if attributes is not None and not isinstance(current, type):
+                stack.append(attributes)
+            for slot in getattr(type(current), '__slots__', ()):
+                if hasattr(current, slot):
+                    stack.append(getattr(current, slot))
+    return total
+
+
+def _measure(state: Dict[str, Any]) -> Tuple[int, List[Tuple[str, int]]]:
+    """Tamanho total do session_state e as maiores chaves"""
+    seen: set = set()
+    sizes = [(key, deep_sizeof(key, seen) + deep_sizeof(value, seen))
+             for key, value in state.items()]
+    sizes.sort(key=lambda item: item[1], reverse=True)
+    return sum(size for _, size in sizes), sizes[:TOP_KEYS]
+
+
+def _sample(profile: SessionProfile, state: Dict[str, Any]) -> None:
+    """Atualiza o tamanho do session_state no perfil"""
+    total, top_keys = _measure(state)
+    game_id = state.get('game_id')
+    with _lock:
+        profile.state_bytes, profile.top_keys = total, top_keys
+        profile.game_id = game_id
+
+
+def sample_current_session() -> Optional[SessionProfile]:
+    """
+    Mede agora o session_state da sessão atual
+
+    Returns:
+        SessionProfile da sessão, ou None fora do Streamlit ou antes do
+        primeiro rerun medido
+    """
+    ctx = get_script_run_ctx(suppress_warning=True)
+    if ctx is None:
+        return None
+    profile = _profiles.get(ctx.session_id)
+    if profile is not None:
+        _sample(profile, ctx.session_state.filtered_state)
+    return profile
+
+
+def forget_idle_profiles(now: Optional[float] = None) -> int:
+    """
+    Esquece os perfis de sessões sem rerun há mais de FORGET_AFTER_SECONDS
+
+    Args:
+        now: Momento de referência (padrão: agora)
+
+    Returns:
+        int: Quantidade de perfis esquecidos
+    """
+    now = now or time.time()
+    with _lock:
+        stale = [session_id for session_id, profile in _profiles.items()
+                 if profile.idle_seconds(now) > FORGET_AFTER_SECONDS]
+        for session_id in stale:
+            del _profiles[session_id]
+    return len(stale)
+
+
+def _maybe_sweep() -> None:
+    """Roda forget_idle_profiles no máximo a cada SWEEP_INTERVAL_SECONDS"""
+    global _last_sweep
+
+    now = time.time()
+    if now - _last_sweep < SWEEP_INTERVAL_SECONDS:
+        return
+    _last_sweep = now
+    forget_idle_profiles(now)
+
+
+def _process_rss() -> int:
+    """Memória residente do processo em bytes (0 se não der para ler)"""
+    try:
+        with open('/proc/self/statm') as f:
+            return int(f.read().split()[1]) * os.sysconf('SC_PAGE_SIZE')
+    except (OSError, ValueError, IndexError):
+        return 0
+
+
+def _capture_baseline() -> None:
+    """Guarda a memória do processo antes da primeira sessão"""
+    global _baseline_rss
+    if _baseline_rss is None:
+        _baseline_rss = _process_rss()
+
+
+def get_profiles() -> List[SessionProfile]:
+    """
+    Perfis das sessões conhecidas pelo processo
+
+    Returns:
+        List[SessionProfile]: Um perfil por sessão
+    """
+    with _lock:
+        return list(_profiles.values())
+
+
+def top_sessions(by: str = 'state_bytes',
+                 limit: int = 5) -> List[SessionProfile]:
+    """
+    Sessões que mais pesam
+
+    Args:
+        by: Atributo de SessionProfile usado na ordenação (ex.:
+            'state_bytes', 'run_seconds', 'runs')
+        limit: Quantidade máxima de sessões
+
+    Returns:
+        List[SessionProfile]: Da mais pesada para a mais leve
+    """
+    return sorted(get_profiles(), key=lambda p: getattr(p, by),
+                  reverse=True)[:limit]
+
+
+def estimate_capacity(
+    store: Optional[SessionStore] = None,
+    budget_mb: float = MEMORY_BUDGET_MB
+) -> Dict[str, float]:
+    """
+    Quantos jogadores simultâneos cabem num orçamento de memória
+
+    O custo por sessão é o maior entre o medido (session_state + registro
+    da partida no store) e o observado (crescimento da memória do processo
+    desde a primeira sessão, dividido pelas sessões). O observado inclui
+    caches que carregam junto com a primeira sessão, então com poucas
+    sessões é um limite superior.
+
+    Args:
+        store: Store das partidas (para o tamanho médio dos registros)
+        budget_mb: Memória disponível para o processo, em MB
+
+    Returns:
+        dict: sessions, state_bytes, record_bytes, observed_bytes,
+        per_session_bytes, baseline_bytes, rss_bytes, budget_bytes e
+        capacity (0 se ainda não houver sessões medidas)
+    """
+    profiles = get_profiles()
+    sessions = len(profiles)
+    state_bytes = (sum(p.state_bytes for p in profiles) / sessions
+                   if sessions else 0)
+    record_bytes = store.stats()['avg_bytes'] if store is not None else 0
+
+    rss = _process_rss()
+    baseline = _baseline_rss or rss
+    observed = (rss - baseline) / sessions if sessions and rss > baseline \
+        else 0
+    per_session = max(state_bytes + record_bytes, observed)
+
+    budget = budget_mb * 1024 * 1024
+    capacity = (int(max(budget - baseline, 0) / per_session)
+                if per_session else 0)
+    return {
+        'sessions': sessions,
+        'state_bytes': state_bytes,
+        'record_bytes': record_bytes,
+        'observed_bytes': observed,
+        'per_session_bytes': per_session,
+        'baseline_bytes': baseline,
+        'rss_bytes': rss,
+        'budget_bytes': budget,
+        'capacity': capacity,
+    }
+
+
+def _format_bytes(size: float) -> str:
+    """Bytes legíveis, ex.: 1.5 KB"""
+    for unit in ('B', 'KB', 'MB'):
+        if size < 1024:
+            return f"{size:.0f} {unit}" if unit == 'B' else \
+                f"{size:.1f} {unit}"
+        size /= 1024
+    return f"{size:.1f} GB"
+
+
+def display_session_diagnostics(store: Optional[SessionStore] = None) -> None:
+    """
+    Exibe na barra lateral o custo desta sessão, as sessões mais pesadas
+    (memória e tempo de rerun) e quantos jogadores cabem no orçamento de
+    memória (BRASILGUESSR_MEMORY_BUDGET_MB)
+
+    Args:
+        store: Store das partidas
+    """
+    if not PROFILER_ENABLED:
+        with st.sidebar:
+            st.caption("Perfil de sessões desligado "
+                       "(BRASILGUESSR_SESSION_PROFILE=1 liga)")
+        return
+
+    profile = sample_current_session()
+
+    with st.sidebar:
+        st.markdown("**🧠 Memória por sessão**")
+        if profile is not None:
+            record = store.session_bytes(profile.game_id) \
+                if store is not None and profile.game_id else 0
+            st.write(
+                f"Esta sessão: {_format_bytes(profile.state_bytes)} no "
+                f"session_state + {_format_bytes(record)} da partida | "
+                f"{profile.runs} reruns "
+                f"({profile.avg_run_seconds * 1000:.0f} ms em média)"
+            )
+            for key, size in profile.top_keys:
+                st.caption(f"`{key}`: {_format_bytes(size)}")
+
+        st.markdown("**Sessões mais pesadas (memória)**")
+        for other in top_sessions('state_bytes'):
+            st.caption(
+                f"{other.session_id[:8]}: {_format_bytes(other.state_bytes)}"
+                f" | parada há {other.idle_seconds():.0f} s"
+            )
+
+        st.markdown("**Sessões mais pesadas (reruns)**")
+        for other in top_sessions('run_seconds'):
+            st.caption(
+                f"{other.session_id[:8]}: {other.run_seconds:.2f} s em "
+                f"{other.runs} reruns ({other.fragment_runs} de fragmento, "
+                f"máx. {other.max_run_seconds * 1000:.0f} ms)"
+            )
+
+        capacity = estimate_capacity(store)
+        sessao_str = "sessão" if capacity['sessions'] == 1 else "sessões"
+        st.markdown("**Capacidade**")
+        st.write(
+            f"~{capacity['capacity']:,} jogadores em "
+            f"{_format_bytes(capacity['budget_bytes'])} "
+            f"({_format_bytes(capacity['per_session_bytes'])} por sessão, "
+            f"{capacity['sessions']} {sessao_str}, processo com "
+            f"{_format_bytes(capacity['rss_bytes'])})"
+        )
+
+        # Com PYTHONTRACEMALLOC=1, mostra onde o processo mais aloca
+        if tracemalloc.is_tracing():
+            st.markdown("**Maiores alocações (tracemalloc)**")
+            stats = tracemalloc.take_snapshot().statistics('lineno')
+            for stat in stats[:TOP_KEYS]:
+                frame = stat.traceback[0]
+                st.caption(f"{os.path.basename(frame.filename)}:"
+                           f"{frame.lineno}: {_format_bytes(stat.size)}")
@@ -1,18 +1,45 @@
 import json
 import os
 from pathlib import Path
-from typing import List, Optional
+from typing import List, Optional, Tuple
 
 from classes.player import Player
+from modules.metrics_handler import timed
 
 RANKING_FILE = 'data/rankings.json'
 
+# Último conteúdo lido do arquivo: ((caminho, mtime, tamanho), dados)
+_rankings_cache: Optional[Tuple[tuple, list]] = None
+
 
 def ensure_data_directory() -> None:
     """Garante que o diretório de dados existe"""
     Path('data').mkdir(parents=True, exist_ok=True)
 
 
+def _read_rankings_data() -> list:
+    """
+    Lê o JSON do ranking, reaproveitando a última leitura enquanto o arquivo
+    não mudar (os jogadores são sempre recriados, então o cache não é
+    alterado por quem chama)
+    """
+    global _rankings_cache
+
+    stat = os.stat(RANKING_FILE)
+    key = (RANKING_FILE, stat.st_mtime_ns, stat.st_size)
+
+    cache = _rankings_cache
+    if cache is not None and cache[0] == key:
+        return cache[1]
+
+    with open(RANKING_FILE, 'r', encoding='utf-8') as f:
+        data = json.load(f)
+
+    _rankings_cache = (key, data)
+    return data
+
+
+@timed()
 def load_rankings() -> List[Player]:
     """
     Carrega os rankings do arquivo JSON
@@ -24,10 +51,9 @@ def load_rankings() -> List[Player]:
         return []
 
     try:
-        with open(RANKING_FILE, 'r', encoding='utf-8') as f:
-            data = json.load(f)
-            players = [Player.from_dict(p) for p in data]
-            return sorted(players, key=lambda x: x.total_score, reverse=True)
+        data = _read_rankings_data()
+        players = [Player.from_dict(p) for p in data]
+        return sorted(players, key=lambda x: x.total_score, reverse=True)
     except json.JSONDecodeError:
         print(f"Erro: Arquivo {RANKING_FILE} contém JSON inválido")
         return []
@@ -36,6 +62,7 @@ def load_rankings() -> List[Player]:
         return []
 
 
+@timed()
 def save_rankings(players: List[Player]) -> bool:
     """
     Salva os rankings no arquivo JSON
@@ -58,6 +85,7 @@ def save_rankings(players: List[Player]) -> bool:
         return False
 
 
+@timed()
 def find_player_by_name(players: List[Player], player_name: str) -> Optional[Player]:
     """
     Busca um jogador na lista pelo nome (case-insensitive)
@@ -76,6 +104,7 @@ def find_player_by_name(players: List[Player], player_name: str) -> Optional[Pla
     return None
 
 
+@timed()
 def add_player_score(player_name: str, score: int) -> bool:
     """
     Adiciona ou atualiza a pontuação de um jogador no ranking
@@ -106,6 +135,7 @@ def add_player_score(player_name: str, score: int) -> bool:
     return save_rankings(players)
 
 
+@timed()
 def get_top_players(limit: int = 10) -> List[Player]:
     """
     Retorna os top N jogadores
@@ -120,6 +150,7 @@ def get_top_players(limit: int = 10) -> List[Player]:
     return players[:limit]
 
 
+@timed()
 def get_player_rank(player_name: str) -> int:
     """
     Retorna a posição de um jogador no ranking
@@ -143,6 +174,7 @@ def get_player_rank(player_name: str) -> int:
     return 0
 
 
+@timed()
 def get_player_stats(player_name: str) -> Optional[Player]:
     """
     Retorna as estatísticas completas de um jogador
@@ -160,6 +192,7 @@ def get_player_stats(player_name: str) -> Optional[Player]:
     return find_player_by_name(players, player_name)
 
 
+@timed()
 def clear_rankings() -> bool:
     """
     Limpa todos os rankings (para testes)
@@ -0,0 +1,90 @@
+from typing import Dict
+
+import streamlit as st
+
+# Chaves usadas no session_state
+RERUN_COUNTS_KEY = 'rerun_counts'
+APP_RUN_ID_KEY = 'app_run_id'
+FRAGMENT_SEEN_PREFIX = 'fragment_seen_'
+
+
+def _round_counts(round_index: int) -> Dict[str, int]:
+    """Retorna (criando se preciso) os contadores de uma rodada"""
+    if RERUN_COUNTS_KEY not in st.session_state:
+        st.session_state[RERUN_COUNTS_KEY] = {}
+
+    counts = st.session_state[RERUN_COUNTS_KEY]
+    if round_index not in counts:
+        counts[round_index] = {'app': 0, 'fragment': 0}
+    return counts[round_index]
+
+
+def record_app_run(round_index: int) -> None:
+    """
+    Registra uma execução completa do app (deve ser chamada no main)
+
+    Args:
+        round_index: Índice da rodada atual
+    """
+    st.session_state[APP_RUN_ID_KEY] = st.session_state.get(APP_RUN_ID_KEY, 0) + 1
+    _round_counts(round_index)['app'] += 1
+
+
+def record_fragment_run(name: str, round_index: int) -> bool:
+    """
+    Registra a execução de um fragmento. Só conta como rerun de fragmento
+    quando o app inteiro não rodou desde a última execução do fragmento.
+
+    Args:
+        name: Nome do fragmento
+        round_index: Índice da rodada atual
+
+    Returns:
+        bool: True se for um rerun só do fragmento
+    """
+    if is_fragment_rerun(name):
+        _round_counts(round_index)['fragment'] += 1
+        return True
+
+    st.session_state[f"{FRAGMENT_SEEN_PREFIX}{name}"] = \
+        st.session_state.get(APP_RUN_ID_KEY, 0)
+    return False
+
+
+def is_fragment_rerun(name: str) -> bool:
+    """
+    Se a execução atual do fragmento é um rerun só dele, sem registrar
+    nada (antes de record_fragment_run na mesma execução)
+
+    Args:
+        name: Nome do fragmento
+
+    Returns:
+        bool: True se o app inteiro não rodou desde a última execução do
+        fragmento
+    """
+    return (st.session_state.get(f"{FRAGMENT_SEEN_PREFIX}{name}") ==
+            st.session_state.get(APP_RUN_ID_KEY, 0))
+
+
+def get_rerun_counts() -> Dict[int, Dict[str, int]]:
+    """
+    Retorna os contadores de reruns por rodada
+
+    Returns:
+        dict: {índice_da_rodada: {'app': n, 'fragment': n}}
+    """
+    return st.session_state.get(RERUN_COUNTS_KEY, {})
+
+
+def display_rerun_stats() -> None:
+    """Exibe na barra lateral os reruns completos e de fragmento por rodada"""
+    counts = get_rerun_counts()
+
+    with st.sidebar:
+        st.markdown("**🔁 Reruns por rodada**")
+        for round_index, round_counts in sorted(counts.items()):
+            st.write(
+                f"Rodada {round_index + 1}: {round_counts['app']} app | "
+                f"{round_counts['fragment']} fragmento"
+            )
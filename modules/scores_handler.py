@@ -1,7 +1,7 @@
 from typing import Tuple
 
-# cálculo da distância a partir das coordenadas
-from geopy.distance import geodesic
+from modules.metrics_handler import timed
+from modules.startup_handler import lazy_import
 
 # Constantes de pontuação e limiares (thresholds)
 # (<qtde_de_pontos>, <threshold>, <mensagem ao usuário>)
@@ -26,6 +26,7 @@ SCORE_YEAR_THRESHOLDS = [
 ]
 
 
+@timed()
 def calculate_distance_km(
     lat1: float,
     lon1: float,
@@ -42,11 +43,15 @@ def calculate_distance_km(
     Returns:
         float: Distância em km
     """
+    # cálculo da distância a partir das coordenadas (geopy só no 1º uso)
+    geodesic = lazy_import('geopy.distance').geodesic
+
     point1 = (lat1, lon1)
     point2 = (lat2, lon2)
     return geodesic(point1, point2).kilometers
 
 
+@timed()
 def calculate_location_score(distance_km: float) -> Tuple[int, str]:
     """
     Calcula a pontuação baseada na distância do chute
@@ -65,6 +70,7 @@ def calculate_location_score(distance_km: float) -> Tuple[int, str]:
     return 100, "😔 Muito longe..."
 
 
+@timed()
 def calculate_year_score(year_guess: int, correct_year: int) -> Tuple[int, str]:
     """
     Calcula a pontuação baseada na diferença de anos
@@ -86,6 +92,7 @@ def calculate_year_score(year_guess: int, correct_year: int) -> Tuple[int, str]:
     return 100, "😔 Muito longe..."
 
 
+@timed()
 def calculate_total_score(
     guess_lat: float,
     guess_lon: float,
@@ -0,0 +1,107 @@
+from bisect import bisect_left
+from functools import lru_cache
+from heapq import nsmallest
+from typing import List, Sequence, Tuple
+
+from classes.place import Place
+from modules.geo_handler import MUNICIPALITIES_FILE, load_places
+from modules.metrics_handler import timed
+from modules.text_utils import fold
+
+LANDMARKS_FILE = 'data/geo/pontos.csv'
+
+DEFAULT_LIMIT = 8
+
+
+class PrefixIndex:
+    """
+    Índice de prefixos sobre nomes de lugares: um array ordenado de chaves
+    normalizadas (sem acentos, minúsculas), buscado com bisect. Cada nome
+    entra uma vez por palavra, então "paulo" também encontra "São Paulo".
+
+    Attributes:
+        places (List[Place]): Lugares indexados
+    """
+
+    def __init__(self, places: Sequence[Place]):
+        self.places = list(places)
+
+        # (chave, é_início_do_nome, índice do lugar)
+        entries: List[Tuple[str, bool, int]] = []
+        for index, place in enumerate(self.places):
+            words = fold(place.name).split(' ')
+            for start in range(len(words)):
+                entries.append((' '.join(words[start:]), start == 0, index))
+        entries.sort()
+
+        self._keys = [key for key, _, _ in entries]
+        # Ordem de exibição de cada chave: primeiro quem começa pela busca,
+        # depois os nomes mais curtos
+        self._ranks = [
+            (not is_start, len(self.places[index].name),
+             self.places[index].name, index)
+            for _, is_start, index in entries
+        ]
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def search(self, query: str, limit: int = DEFAULT_LIMIT) -> List[Place]:
+        """
+        Lugares cujo nome (ou alguma palavra do nome) começa com a busca
+
+        Args:
+            query: Texto digitado
+            limit: Quantidade máxima de resultados
+
+        Returns:
+            List[Place]: Resultados, primeiro os que começam pela busca e
+            depois os nomes mais curtos
+        """
+        prefix = fold(query)
+        if not prefix:
+            return []
+
+        # Todas as chaves com o prefixo ficam num intervalo contíguo: o fim
+        # é a primeira chave maior que qualquer uma que comece com ele
+        start = bisect_left(self._keys, prefix)
+        end = bisect_left(self._keys, prefix[:-1] + chr(ord(prefix[-1]) + 1),
+                          start)
+
+        # Ranqueia o intervalo inteiro (um lugar pode aparecer mais de uma
+        # vez, por nome e por palavra; vale a melhor posição)
+        best = {}
+        for rank in self._ranks[start:end]:
+            index = rank[3]
+            if index not in best or rank < best[index]:
+                best[index] = rank
+        return [self.places[rank[3]]
+                for rank in nsmallest(limit, best.values())]
+
+
+@lru_cache(maxsize=1)
+def get_place_index() -> PrefixIndex:
+    """
+    Monta o índice de municípios e pontos de referência uma vez por processo
+
+    Returns:
+        PrefixIndex: Índice pronto para buscas
+    """
+    return PrefixIndex(load_places(MUNICIPALITIES_FILE) +
+                       load_places(LANDMARKS_FILE))
+
+
+@timed()
+def search_places(query: str, limit: int = DEFAULT_LIMIT) -> List[Place]:
+    """
+    Busca municípios e pontos de referência pelo começo do nome, ignorando
+    acentos e maiúsculas
+
+    Args:
+        query: Texto digitado
+        limit: Quantidade máxima de resultados
+
+    Returns:
+        List[Place]: Lugares encontrados
+    """
+    return get_place_index().search(query, limit)
@@ -0,0 +1,152 @@
+import importlib
+import os
+import sys
+import threading
+import time
+from types import ModuleType
+from typing import Callable, Dict, List
+
+
+def _process_start() -> float:
+    """
+    Início do processo na escala de time.perf_counter, lido de
+    /proc/self/stat (inclui a subida do Python, do Streamlit e as
+    importações). Fora do Linux, cai para o momento desta importação.
+    """
+    now = time.perf_counter()
+    try:
+        with open('/proc/self/stat') as f:
+            # O nome do processo (2º campo) pode ter espaços; os campos
+            # seguintes vêm depois do último ')'
+            fields = f.read().rsplit(')', 1)[1].split()
+        with open('/proc/uptime') as f:
+            uptime = float(f.read().split()[0])
+        start_ticks = int(fields[19])  # starttime, 22º campo
+        age = uptime - start_ticks / os.sysconf('SC_CLK_TCK')
+    except (OSError, ValueError, IndexError):
+        return now
+    return now - max(age, 0.0)
+
+
+# Marco zero do perfil: o início do processo, não a importação deste módulo
+PROCESS_START = _process_start()
+
+# Configuração via variáveis de ambiente
+PROFILE_ENABLED = os.environ.get('BRASILGUESSR_STARTUP_PROFILE') == '1'
+WARMUP_ENABLED = os.environ.get('BRASILGUESSR_WARMUP') == '1'
+
+# Marco que encerra o perfil de inicialização
+FIRST_PHOTO_MILESTONE = 'first_photo_painted'
+
+_milestones: Dict[str, float] = {}
+_imports: Dict[str, float] = {}
+_lock = threading.Lock()
+_warmup_thread = None
+_reported = False
+
+# Quanto da inicialização passou antes deste módulo ser importado
+_milestones['startup_handler_imported'] = time.perf_counter() - PROCESS_START
+
+
+def lazy_import(module_name: str) -> ModuleType:
+    """
+    Importa um módulo pesado só quando ele é usado pela primeira vez,
+    registrando quanto tempo a importação levou
+
+    Args:
+        module_name: Nome do módulo (ex.: 'folium')
+
+    Returns:
+        O módulo importado
+    """
+    # import_module (e não só sys.modules) espera a importação terminar se
+    # outra thread, como a de aquecimento, estiver importando o módulo
+    if module_name in sys.modules:
+        return importlib.import_module(module_name)
+
+    start = time.perf_counter()
+    module = importlib.import_module(module_name)
+    with _lock:
+        _imports.setdefault(module_name, time.perf_counter() - start)
+    return module
+
+
+def mark(name: str) -> None:
+    """
+    Registra um marco da inicialização (só a primeira ocorrência no processo)
+
+    Args:
+        name: Nome do marco
+    """
+    if name in _milestones:
+        return
+
+    with _lock:
+        _milestones.setdefault(name, time.perf_counter() - PROCESS_START)
+
+    if name == FIRST_PHOTO_MILESTONE and PROFILE_ENABLED:
+        report()
+
+
+def get_profile() -> dict:
+    """
+    Retorna o perfil de inicialização
+
+    Returns:
+        dict: {'milestones': {marco: segundos desde o início},
+               'imports': {módulo: segundos de importação}}
+    """
+    with _lock:
+        return {
+            'milestones': dict(sorted(_milestones.items(), key=lambda x: x[1])),
+            'imports': dict(_imports),
+        }
+
+
+def report() -> None:
+    """Imprime o perfil de inicialização (uma vez por processo)"""
+    global _reported
+
+    if _reported:
+        return
+    _reported = True
+
+    profile = get_profile()
+    print("Perfil de inicialização do Brasil Guessr:")
+    for name, seconds in profile['milestones'].items():
+        print(f"  {name:<28} {seconds * 1000:8.1f} ms")
+    for name, seconds in profile['imports'].items():
+        print(f"  import {name:<21} {seconds * 1000:8.1f} ms")
+
+
+def start_warmup(tasks: List[Callable[[], object]]) -> bool:
+    """
+    Aquece os caches em segundo plano (uma vez por processo), para que o
+    primeiro visitante não pague pelo carregamento
+
+    Args:
+        tasks: Funções executadas em sequência na thread de aquecimento
+
+    Returns:
+        bool: True se o aquecimento foi iniciado agora
+    """
+    global _warmup_thread
+
+    with _lock:
+        if _warmup_thread is not None:
+            return False
+
+        def run():
+            for task in tasks:
+                try:
+                    task()
+                except Exception as e:
+                    name = getattr(task, '__name__', repr(task))
+                    print(f"Erro no aquecimento ({name}): {e}")
+            mark('warmup_finished')
+
+        _warmup_thread = threading.Thread(
+            target=run, name='brasilguessr-warmup', daemon=True)
+
+    _warmup_thread.start()
+    return True
@@ -0,0 +1,57 @@
+import re
+import unicodedata
+
+# Troca de letras por números/símbolos ("leetspeak")
+LEET_TABLE = str.maketrans({
+    '0': 'o', '1': 'i', '3': 'e', '4': 'a', '5': 's', '7': 't', '8': 'b',
+    '@': 'a', '$': 's', '!': 'i', '|': 'i', '+': 't',
+})
+
+_REPEATED = re.compile(r'(.)\1+')
+_SEPARATORS = re.compile(r'[^\w\s]+')
+_SPACES = re.compile(r'[\s_]+')
+
+
+def strip_accents(text: str) -> str:
+    """
+    Remove acentos e cedilhas ("São Paulo" -> "Sao Paulo")
+
+    Args:
+        text: Texto original
+
+    Returns:
+        str: Texto sem acentos
+    """
+    decomposed = unicodedata.normalize('NFKD', text)
+    return ''.join(c for c in decomposed if not unicodedata.combining(c))
+
+
+def fold(text: str) -> str:
+    """
+    Forma usada em buscas: minúsculas, sem acentos e com espaços simples
+
+    Args:
+        text: Texto original
+
+    Returns:
+        str: Texto normalizado
+    """
+    return _SPACES.sub(' ', strip_accents(text).casefold()).strip()
+
+
+def normalize_for_moderation(text: str) -> str:
+    """
+    Forma usada no filtro de nomes: além de fold(), desfaz leetspeak,
+    remove pontuação no meio das palavras ("p.u.t.a") e colapsa letras
+    repetidas ("merdaaa" -> "merda")
+
+    Args:
+        text: Texto original
+
+    Returns:
+        str: Texto normalizado (só letras, dígitos e espaços simples)
+    """
+    text = strip_accents(text).casefold().translate(LEET_TABLE)
+    text = _SEPARATORS.sub('', text)
+    text = _SPACES.sub(' ', text).strip()
+    return _REPEATED.sub(r'\1', text)
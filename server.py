@@ -0,0 +1,329 @@
+"""
+API HTTP do Brasil Guessr (asyncio, sem dependências extras)
+
+A pontuação é calculada no servidor pelo GameEngine; o cliente só envia os
+chutes. As partidas ficam em memória (ou no SQLite de
+BRASILGUESSR_SESSION_DB, compartilhado entre instâncias) e expiram após um
+tempo sem acesso.
+
+Uso:
+    python server.py --port 8080
+
+Rotas:
+    POST /games                   inicia uma partida
+    GET  /games/<id>/round        rodada atual (sem a resposta)
+    POST /games/<id>/guess        {"lat": .., "lon": .., "year": ..}
+    POST /games/<id>/next         avança para a próxima rodada
+    POST /games/<id>/finish       {"name": ..} envia ao ranking
+    GET  /health
+"""
+import argparse
+import asyncio
+import json
+import traceback
+from typing import Optional, Tuple
+
+from classes.game_engine import (EVICTION_INTERVAL_SECONDS, MAX_YEAR,
+                                 MIN_YEAR, GameEngine, GameError)
+from classes.game_session import GameSession
+from modules import geo_handler, photo_handler, scores_handler
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8080
+MAX_BODY_BYTES = 16 * 1024
+KEEP_ALIVE_TIMEOUT_SECONDS = 30
+
+STATUS_TEXT = {
+    200: 'OK', 201: 'Created', 400: 'Bad Request', 404: 'Not Found',
+    405: 'Method Not Allowed', 409: 'Conflict', 413: 'Payload Too Large',
+    500: 'Internal Server Error',
+}
+
+
+class HttpError(Exception):
+    """Erro com status HTTP"""
+
+    def __init__(self, status: int, message: str):
+        super().__init__(message)
+        self.status = status
+
+
+def round_payload(engine: GameEngine, session: GameSession) -> dict:
+    """Rodada atual, sem revelar a resposta antes do chute"""
+    photo = engine.current_photo(session)
+    payload = {
+        'game_id': session.game_id,
+        'round': session.round_index + 1,
+        'total_rounds': session.total_rounds,
+        'total_score': session.total_score,
+        'finished': session.finished,
+        'guess_made': session.guess_made,
+        'photo': {
+            'id': photo.id,
+            'url': photo.url,
+            'photographer': photo.photographer,
+        },
+    }
+    if session.guess_made:
+        payload['result'] = result_payload(engine, session)
+    return payload
+
+
+def result_payload(engine: GameEngine, session: GameSession) -> dict:
+    """Resultado da rodada atual, com a resposta correta"""
+    result = session.current_result
+    photo = engine.photos[result.photo_id]
+    _, location_msg = scores_handler.calculate_location_score(result.distance_km)
+    _, year_msg = scores_handler.calculate_year_score(result.guess_year, photo.year)
+
+    payload = result.to_dict()
+    payload.update({
+        'location_message': location_msg,
+        'year_message': year_msg,
+        'guess_place': geo_handler.describe_location(
+            result.guess_lat, result.guess_lon),
+        'answer': {
+            'latitude': photo.latitude,
+            'longitude': photo.longitude,
+            'place': geo_handler.format_place(engine.answer_places[photo.id]),
+            'year': photo.year,
+            'description': photo.description,
+        },
+        'game_total_score': session.total_score,
+    })
+    return payload
+
+
+def _parse_guess(body: dict) -> Tuple[float, float, int]:
+    """Valida o corpo de um chute"""
+    try:
+        lat, lon, year = float(body['lat']), float(body['lon']), int(body['year'])
+    except (KeyError, TypeError, ValueError):
+        raise HttpError(400, "Envie lat, lon e year numéricos.")
+    if not (-90 <= lat <= 90 and -180 <= lon <= 180):
+        raise HttpError(400, "Coordenadas fora do intervalo válido.")
+    if not MIN_YEAR <= year <= MAX_YEAR:
+        raise HttpError(
+            400, f"O ano deve estar entre {MIN_YEAR} e {MAX_YEAR}.")
+    return lat, lon, year
+
+
+async def handle_request(
+    engine: GameEngine,
+    method: str,
+    path: str,
+    body: dict
+) -> Tuple[int, dict]:
+    """
+    Despacha uma requisição para o GameEngine numa thread: o store (SQLite)
+    e o ranking fazem E/S bloqueante, que não pode travar o loop de eventos
+
+    Returns:
+        Tupla com (status, corpo_json)
+    """
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        None, dispatch, engine, method, path, body)
+
+
+def dispatch(
+    engine: GameEngine,
+    method: str,
+    path: str,
+    body: dict
+) -> Tuple[int, dict]:
+    """
+    Executa uma requisição no GameEngine (bloqueante)
+
+    Returns:
+        Tupla com (status, corpo_json)
+    """
+    parts = [p for p in path.split('?', 1)[0].split('/') if p]
+
+    if parts == ['health']:
+        stats = engine.store.stats()
+        return 200, {'status': 'ok', 'active_sessions': stats['sessions'],
+                     'session_bytes': stats['bytes']}
+
+    if parts == ['games']:
+        if method != 'POST':
+            raise HttpError(405, "Use POST para iniciar uma partida.")
+        session = engine.start_game()
+        return 201, round_payload(engine, session)
+
+    if len(parts) != 3 or parts[0] != 'games':
+        raise HttpError(404, "Rota não encontrada.")
+
+    game_id, action = parts[1], parts[2]
+    session = engine.get_session(game_id)
+    if session is None:
+        raise HttpError(404, "Partida não encontrada ou expirada.")
+
+    if action == 'round' and method == 'GET':
+        return 200, round_payload(engine, session)
+
+    if method != 'POST':
+        raise HttpError(405, "Método não permitido.")
+
+    # As ações devolvem a partida relida do store (o objeto acima é uma cópia)
+    if action == 'guess':
+        engine.submit_guess(game_id, *_parse_guess(body))
+        return 200, result_payload(engine, engine.get_session(game_id))
+
+    if action == 'next':
+        session = engine.advance_round(game_id)
+        return 200, round_payload(engine, session)
+
+    if action == 'finish':
+        rank = engine.submit_to_ranking(game_id, str(body.get('name', '')))
+        return 200, {'total_score': session.total_score, 'rank': rank}
+
+    raise HttpError(404, "Rota não encontrada.")
+
+
+async def read_request(
+    reader: asyncio.StreamReader
+) -> Optional[Tuple[str, str, dict, bool]]:
+    """
+    Lê uma requisição HTTP/1.1
+
+    Returns:
+        Tupla com (método, caminho, corpo, keep_alive), ou None se a conexão
+        foi fechada
+    """
+    request_line = await reader.readline()
+    if not request_line:
+        return None
+
+    try:
+        method, path, version = request_line.decode('latin-1').split()
+    except ValueError:
+        raise HttpError(400, "Requisição inválida.")
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    try:
+        length = int(headers.get('content-length', '0') or 0)
+    except ValueError:
+        raise HttpError(400, "Content-Length inválido.")
+    if length < 0:
+        raise HttpError(400, "Content-Length inválido.")
+    if length > MAX_BODY_BYTES:
+        raise HttpError(413, "Corpo grande demais.")
+
+    body = {}
+    if length:
+        try:
+            body = json.loads(await reader.readexactly(length))
+        except (json.JSONDecodeError, UnicodeDecodeError):
+            raise HttpError(400, "Corpo JSON inválido.")
+        if not isinstance(body, dict):
+            raise HttpError(400, "O corpo deve ser um objeto JSON.")
+
+    connection = headers.get('connection', '').lower()
+    keep_alive = (connection != 'close' if version == 'HTTP/1.1'
+                  else connection == 'keep-alive')
+    return method.upper(), path, body, keep_alive
+
+
+def write_response(
+    writer: asyncio.StreamWriter,
+    status: int,
+    payload: dict,
+    keep_alive: bool
+) -> None:
+    """Escreve uma resposta JSON"""
+    body = json.dumps(payload, ensure_ascii=False).encode('utf-8')
+    head = (
+        f"HTTP/1.1 {status} {STATUS_TEXT.get(status, '')}\r\n"
+        f"Content-Type: application/json; charset=utf-8\r\n"
+        f"Content-Length: {len(body)}\r\n"
+        f"Connection: {'keep-alive' if keep_alive else 'close'}\r\n\r\n"
+    )
+    writer.write(head.encode('latin-1') + body)
+
+
+async def handle_connection(
+    engine: GameEngine,
+    reader: asyncio.StreamReader,
+    writer: asyncio.StreamWriter
+) -> None:
+    """Atende uma conexão, com keep-alive"""
+    try:
+        while True:
+            try:
+                request = await asyncio.wait_for(
+                    read_request(reader), KEEP_ALIVE_TIMEOUT_SECONDS)
+            except HttpError as e:
+                write_response(writer, e.status, {'error': str(e)}, False)
+                break
+            if request is None:
+                break
+
+            method, path, body, keep_alive = request
+            try:
+                status, payload = await handle_request(engine, method, path, body)
+            except HttpError as e:
+                status, payload = e.status, {'error': str(e)}
+            except GameError as e:
+                status, payload = 409, {'error': str(e)}
+            except Exception:
+                # Erro inesperado: responde 500 em vez de largar o cliente
+                # sem resposta
+                traceback.print_exc()
+                status, payload = 500, {'error': "Erro interno."}
+
+            write_response(writer, status, payload, keep_alive)
+            await writer.drain()
+            if not keep_alive:
+                break
+    except (asyncio.TimeoutError, asyncio.IncompleteReadError, ConnectionError):
+        pass
+    finally:
+        writer.close()
+
+
+async def evict_periodically(engine: GameEngine) -> None:
+    """Descarta partidas expiradas de tempos em tempos"""
+    while True:
+        await asyncio.sleep(EVICTION_INTERVAL_SECONDS)
+        await asyncio.get_running_loop().run_in_executor(
+            None, engine.evict_expired)
+
+
+async def serve(host: str, port: int) -> None:
+    """Sobe o servidor e atende até ser interrompido"""
+    engine = GameEngine(photo_handler.load_photo_catalog())
+
+    server = await asyncio.start_server(
+        lambda r, w: handle_connection(engine, r, w), host, port)
+    eviction_task = asyncio.create_task(evict_periodically(engine))
+
+    print(f"Brasil Guessr API em http://{host}:{port}")
+    try:
+        async with server:
+            await server.serve_forever()
+    finally:
+        eviction_task.cancel()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description="API HTTP do Brasil Guessr")
+    parser.add_argument('--host', default=DEFAULT_HOST)
+    parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    args = parser.parse_args()
+
+    try:
+        asyncio.run(serve(args.host, args.port))
+    except KeyboardInterrupt:
+        pass
+
+
+if __name__ == "__main__":
+    main()